@@ -4,7 +4,9 @@ Provides monitoring of Tracer3210AN solar charge controller via Modbus RTU.
 """
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from typing import FrozenSet, List, Optional, Tuple
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
@@ -13,8 +15,26 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, CONF_SLAVE_ID, CONF_BAUDRATE, DEFAULT_SCAN_INTERVAL
-from .modbus_client import TracerModbusClient
+from .const import (
+    DOMAIN,
+    CONF_SLAVE_ID,
+    CONF_BAUDRATE,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_RETRY_INTERVAL,
+    STATISTICS_SCAN_INTERVAL,
+    CONFIG_SCAN_INTERVAL,
+    MAX_CACHED_FAILURES,
+    ADAPTIVE_FAST_INTERVAL,
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_IDLE_UPDATES,
+    MIN_SCAN_INTERVAL,
+    ACTIVITY_REGISTERS,
+    REALTIME_BLOCKS,
+    STATISTICS_BLOCKS,
+    CONFIG_BLOCKS,
+)
+from .modbus_client import TracerModbusClient, coalesce_register_blocks
+from .registers import RegisterData, RegisterLayout
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,69 +56,154 @@ CONFIG_SCHEMA = vol.Schema(
 
 
 class TracerSolarChargerCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from the Tracer Solar Charger."""
-
-    def __init__(self, hass: HomeAssistant, config: dict) -> None:
-        """Initialize the coordinator."""
-        self.config = config
-        self.client = TracerModbusClient(
-            port=config[CONF_DEVICE],
-            baudrate=config.get(CONF_BAUDRATE, 115200),
-            slave_id=config.get(CONF_SLAVE_ID, 1),
-        )
+    """Class to manage fetching one group of registers from the Tracer Solar Charger.
+
+    Realtime, statistics and configuration registers change at very
+    different rates, so each group is polled by its own coordinator. All
+    coordinators share one client and take turns on the serial port.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: TracerModbusClient,
+        lock: asyncio.Lock,
+        executor: ThreadPoolExecutor,
+        name: str,
+        blocks: List[tuple],
+        function_code: int,
+        scan_interval: int,
+        activity_registers: Tuple[int, ...] = (),
+    ) -> None:
+        """Initialize the coordinator.
+
+        If activity_registers is given, the update interval adapts to how
+        often those registers change between updates.
+        """
+        self.client = client
+        self._lock = lock
+        self.executor = executor
+        self._function_code = function_code
+        self._reads = coalesce_register_blocks(blocks)
+        self.layout = RegisterLayout(self._reads)
+        self._original_interval = timedelta(seconds=scan_interval)
+        self._retry_interval = timedelta(seconds=DEFAULT_RETRY_INTERVAL)
+        self._failed_updates = 0
+        # Offsets of the registers read by the last successful update
+        self.present_offsets: FrozenSet[int] = frozenset()
+        self._activity_registers = activity_registers
+        self._activity_signature: Optional[tuple] = None
+        self._unchanged_updates = 0
+        self._adaptive_seconds = scan_interval
         
         super().__init__(
             hass,
             _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            name=f"{DOMAIN}_{name}",
+            update_interval=self._original_interval,
         )
 
     async def _async_update_data(self):
-        """Fetch data from the solar charger."""
+        """Fetch data from the solar charger.
+
+        A failed update is retried after a shorter interval while the last
+        good data is kept available, up to MAX_CACHED_FAILURES times in a row.
+        """
         try:
-            return await self.hass.async_add_executor_job(self._fetch_data)
+            async with self._lock:
+                data = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self._fetch_data
+                )
         except Exception as err:
-            raise UpdateFailed(f"Error communicating with solar charger: {err}")
+            self._failed_updates += 1
+            self.update_interval = self._retry_interval
+            if self.data is None or self._failed_updates > MAX_CACHED_FAILURES:
+                raise UpdateFailed(f"Error communicating with solar charger: {err}")
+            _LOGGER.warning(
+                "Update failed (%d/%d), keeping last data and retrying in %s: %s",
+                self._failed_updates, MAX_CACHED_FAILURES, self._retry_interval, err,
+            )
+            return self.data
+        
+        self._failed_updates = 0
+        self.present_offsets = data.present_offsets()
+        self.update_interval = self._next_interval(data)
+        return data
+
+    def _next_interval(self, data: RegisterData) -> timedelta:
+        """Return the update interval to use after a successful update."""
+        if not self._activity_registers:
+            return self._original_interval
+        
+        signature = tuple(data.get(address) for address in self._activity_registers)
+        if signature != self._activity_signature:
+            # Values are changing, poll quickly
+            self._activity_signature = signature
+            self._unchanged_updates = 0
+            seconds = ADAPTIVE_FAST_INTERVAL
+        else:
+            self._unchanged_updates += 1
+            seconds = self._adaptive_seconds
+            if self._unchanged_updates >= ADAPTIVE_IDLE_UPDATES:
+                seconds = min(seconds * 2, ADAPTIVE_MAX_INTERVAL)
+        
+        self._adaptive_seconds = max(seconds, MIN_SCAN_INTERVAL)
+        return timedelta(seconds=self._adaptive_seconds)
 
     def _fetch_data(self):
-        """Fetch data from the solar charger (runs in executor)."""
+        """Fetch data from the solar charger (runs in executor).
+
+        The serial port is kept open between updates and only reopened
+        after a failed update.
+        """
+        if not self.client.is_connected and not self.client.connect():
+            raise ConnectionError(f"Failed to connect to {self.client.port}")
+
         try:
-            with self.client:
-                # Read all available parameters efficiently
-                data = {}
-                
-                # Read real-time data blocks
-                realtime_blocks = [
-                    (0x3100, 16, "realtime_core"),      # PV, Battery, Load core data
-                    (0x3110, 16, "realtime_extended"),  # Temperatures, SOC
-                    (0x3200, 3, "status"),              # System status
-                    (0x3300, 31, "statistics"),         # Daily statistics
-                ]
-                
-                for start_addr, count, block_name in realtime_blocks:
-                    block_data = self.client.read_register_block(start_addr, count, is_holding=False)
-                    if block_data:
-                        data.update(block_data)
-                
-                # Read configuration data (less frequently)
-                config_blocks = [
-                    (0x9000, 8, "config_voltages"),     # Core voltage settings
-                    (0x9008, 8, "config_extended"),     # Extended configuration
-                ]
-                
-                for start_addr, count, block_name in config_blocks:
-                    block_data = self.client.read_register_block(start_addr, count, is_holding=True)
-                    if block_data:
-                        data.update(block_data)
-                
-                return data
-                
+            data = RegisterData(self.layout)
+            
+            # Blocks are coalesced into as few requests as possible
+            for start_addr, count in self._reads:
+                values = self.client.read_registers(self._function_code, start_addr, count)
+                if values is None:
+                    # Timed out or rejected: fail the update so the last good
+                    # data is kept and the read is retried soon
+                    raise UpdateFailed(f"No valid response for registers at 0x{start_addr:04X}")
+                data.set_block(start_addr, values[:count])
+            
+            return data
+            
         except Exception as err:
             _LOGGER.error("Failed to fetch data from solar charger: %s", err)
+            # Drop the connection so the next update reopens the port
+            self.client.disconnect()
             raise
 
 
+def create_coordinators(hass: HomeAssistant, config: dict) -> List[TracerSolarChargerCoordinator]:
+    """Create the realtime, statistics and configuration coordinators."""
+    client = TracerModbusClient(
+        port=config[CONF_DEVICE],
+        baudrate=config.get(CONF_BAUDRATE, 115200),
+        slave_id=config.get(CONF_SLAVE_ID, 1),
+    )
+    lock = asyncio.Lock()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tracer_modbus")
+    
+    return [
+        TracerSolarChargerCoordinator(
+            hass, client, lock, executor, "realtime", REALTIME_BLOCKS, 0x04, DEFAULT_SCAN_INTERVAL,
+            activity_registers=ACTIVITY_REGISTERS,
+        ),
+        TracerSolarChargerCoordinator(
+            hass, client, lock, executor, "statistics", STATISTICS_BLOCKS, 0x04, STATISTICS_SCAN_INTERVAL
+        ),
+        TracerSolarChargerCoordinator(
+            hass, client, lock, executor, "config", CONFIG_BLOCKS, 0x03, CONFIG_SCAN_INTERVAL
+        ),
+    ]
+
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Tracer Solar Charger component."""
     if DOMAIN not in config:
@@ -106,13 +211,14 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
     hass.data.setdefault(DOMAIN, {})
     
-    # Create coordinator
-    coordinator = TracerSolarChargerCoordinator(hass, config[DOMAIN])
+    # Create coordinators
+    coordinators = create_coordinators(hass, config[DOMAIN])
     
     # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    for coordinator in coordinators:
+        await coordinator.async_config_entry_first_refresh()
     
-    hass.data[DOMAIN]["coordinator"] = coordinator
+    hass.data[DOMAIN]["coordinators"] = coordinators
     
     # Load platforms
     for platform in PLATFORMS:
@@ -127,21 +233,51 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Tracer Solar Charger from a config entry."""
     hass.data.setdefault(DOMAIN, {})
     
-    coordinator = TracerSolarChargerCoordinator(hass, entry.data)
-    await coordinator.async_config_entry_first_refresh()
+    coordinators = create_coordinators(hass, entry.data)
+    hass.data[DOMAIN][entry.entry_id] = coordinators
     
-    hass.data[DOMAIN][entry.entry_id] = coordinator
-    
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Set up the platforms while the first refresh runs; sensors report
+    # unavailable until their coordinator has data. Both are awaited to the
+    # end so a failure never leaves the other half running.
+    refresh_result, forward_result = await asyncio.gather(
+        _async_first_refresh(coordinators),
+        hass.config_entries.async_forward_entry_setups(entry, PLATFORMS),
+        return_exceptions=True,
+    )
+    if isinstance(refresh_result, BaseException) or isinstance(forward_result, BaseException):
+        if not isinstance(forward_result, BaseException):
+            # Let HA's retry set the platforms up again from scratch
+            await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+        # Unload never runs for a failed setup, so release the port and thread here
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        await _async_release(coordinators)
+        raise refresh_result if isinstance(refresh_result, BaseException) else forward_result
     
     return True
 
 
+async def _async_first_refresh(coordinators: List[TracerSolarChargerCoordinator]) -> None:
+    """Run each coordinator's first refresh, stopping at the first failure."""
+    # They share one lock and executor, so running them concurrently gains nothing
+    for coordinator in coordinators:
+        await coordinator.async_config_entry_first_refresh()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_release(hass.data[DOMAIN].pop(entry.entry_id))
     
     return unload_ok
+
+
+async def _async_release(coordinators: List[TracerSolarChargerCoordinator]) -> None:
+    """Close the serial port and stop the executor shared by the coordinators."""
+    # All coordinators share the same client and executor
+    coordinator = coordinators[0]
+    await asyncio.get_running_loop().run_in_executor(
+        coordinator.executor, coordinator.client.disconnect
+    )
+    coordinator.executor.shutdown(wait=False)
@@ -1,5 +1,8 @@
 """Constants for the Tracer Solar Charger integration."""
 
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
 DOMAIN = "tracer_solar_charger"
 
 # Configuration keys
@@ -9,302 +12,355 @@ CONF_BAUDRATE = "baudrate"
 # Default values
 DEFAULT_SCAN_INTERVAL = 30  # seconds
 DEFAULT_TIMEOUT = 3  # seconds
+DEFAULT_RETRY_INTERVAL = 5  # seconds between retries after a failed update
+MAX_CACHED_FAILURES = 6  # failed updates served from cached data before giving up
 
 # Device information
 MANUFACTURER = "EPEVER"
 MODEL = "Tracer3210AN"
 
+# Adaptive realtime polling: poll quickly while power readings change and
+# back off (doubling) once they have been unchanged for a few updates
+ADAPTIVE_FAST_INTERVAL = 10  # seconds
+ADAPTIVE_MAX_INTERVAL = 300  # seconds
+ADAPTIVE_IDLE_UPDATES = 3  # unchanged updates before backing off
+MIN_SCAN_INTERVAL = 5  # seconds
+
+# Registers compared between updates to detect activity (PV, battery and load power)
+ACTIVITY_REGISTERS = (0x3102, 0x3103, 0x3106, 0x3107, 0x310A, 0x310B)
+
+# Poll intervals for registers that change slowly
+STATISTICS_SCAN_INTERVAL = 300  # seconds
+CONFIG_SCAN_INTERVAL = 3600  # seconds
+
+# Register blocks read on each update as (start address, register count)
+REALTIME_BLOCKS = [
+    (0x3100, 16),  # PV, Battery, Load core data
+    (0x3110, 16),  # Temperatures, SOC
+    (0x3200, 3),   # System status
+]
+
+STATISTICS_BLOCKS = [
+    (0x3300, 31),  # Daily statistics
+]
+
+CONFIG_BLOCKS = [
+    (0x9000, 8),   # Core voltage settings
+    (0x9008, 8),   # Extended configuration
+]
+
+
+@dataclass(slots=True, frozen=True)
+class SensorSpec:
+    """Static description of a sensor and the register(s) it reads."""
+
+    name: str
+    address: int
+    unit: str = ""
+    scale: float = 1
+    offset: float = 0
+    device_class: Optional[str] = None
+    state_class: Optional[str] = None
+    category: Optional[str] = None
+    icon: Optional[str] = None
+    combine_registers: bool = False
+    high_address: Optional[int] = None
+    kind: Optional[str] = None  # "status" or "enum"; None for numeric sensors
+    # (raw value, label) pairs; a tuple so the frozen spec stays hashable
+    enum_values: Tuple[Tuple[int, str], ...] = ()
+
+
 # Sensor types and their properties
-SENSOR_TYPES = {
+SENSOR_TYPES: Dict[str, SensorSpec] = {
     # PV Parameters
-    "pv_voltage": {
-        "name": "PV Voltage",
-        "address": 0x3100,
-        "unit": "V",
-        "scale": 0.01,
-        "device_class": "voltage",
-        "state_class": "measurement",
-        "category": "pv",
-        "icon": "mdi:solar-panel",
-    },
-    "pv_current": {
-        "name": "PV Current",
-        "address": 0x3101,
-        "unit": "A",
-        "scale": 0.01,
-        "device_class": "current",
-        "state_class": "measurement",
-        "category": "pv",
-        "icon": "mdi:current-dc",
-    },
-    "pv_power": {
-        "name": "PV Power",
-        "address": 0x3102,  # Low word, will combine with high word
-        "unit": "W",
-        "scale": 0.01,
-        "device_class": "power",
-        "state_class": "measurement",
-        "category": "pv",
-        "icon": "mdi:solar-power",
-        "combine_registers": True,
-        "high_address": 0x3103,
-    },
+    "pv_voltage": SensorSpec(
+        name="PV Voltage",
+        address=0x3100,
+        unit="V",
+        scale=0.01,
+        device_class="voltage",
+        state_class="measurement",
+        category="pv",
+        icon="mdi:solar-panel",
+    ),
+    "pv_current": SensorSpec(
+        name="PV Current",
+        address=0x3101,
+        unit="A",
+        scale=0.01,
+        device_class="current",
+        state_class="measurement",
+        category="pv",
+        icon="mdi:current-dc",
+    ),
+    "pv_power": SensorSpec(
+        name="PV Power",
+        address=0x3102,  # Low word, will combine with high word
+        unit="W",
+        scale=0.01,
+        device_class="power",
+        state_class="measurement",
+        category="pv",
+        icon="mdi:solar-power",
+        combine_registers=True,
+        high_address=0x3103,
+    ),
     
     # Battery Parameters
-    "battery_voltage": {
-        "name": "Battery Voltage",
-        "address": 0x3104,
-        "unit": "V",
-        "scale": 0.01,
-        "device_class": "voltage",
-        "state_class": "measurement",
-        "category": "battery",
-        "icon": "mdi:battery",
-    },
-    "battery_current": {
-        "name": "Battery Current",
-        "address": 0x3105,
-        "unit": "A",
-        "scale": 0.01,
-        "device_class": "current",
-        "state_class": "measurement",
-        "category": "battery",
-        "icon": "mdi:current-dc",
-    },
-    "battery_power": {
-        "name": "Battery Power",
-        "address": 0x3106,
-        "unit": "W",
-        "scale": 0.01,
-        "device_class": "power",
-        "state_class": "measurement",
-        "category": "battery",
-        "icon": "mdi:battery-charging",
-        "combine_registers": True,
-        "high_address": 0x3107,
-    },
-    "battery_soc": {
-        "name": "Battery State of Charge",
-        "address": 0x311A,
-        "unit": "%",
-        "scale": 1,
-        "device_class": "battery",
-        "state_class": "measurement",
-        "category": "battery",
-        "icon": "mdi:battery-50",
-    },
-    "battery_temp": {
-        "name": "Battery Temperature",
-        "address": 0x3110,
-        "unit": "°C",
-        "scale": 0.01,
-        "offset": -273.15,
-        "device_class": "temperature",
-        "state_class": "measurement",
-        "category": "battery",
-        "icon": "mdi:thermometer",
-    },
+    "battery_voltage": SensorSpec(
+        name="Battery Voltage",
+        address=0x3104,
+        unit="V",
+        scale=0.01,
+        device_class="voltage",
+        state_class="measurement",
+        category="battery",
+        icon="mdi:battery",
+    ),
+    "battery_current": SensorSpec(
+        name="Battery Current",
+        address=0x3105,
+        unit="A",
+        scale=0.01,
+        device_class="current",
+        state_class="measurement",
+        category="battery",
+        icon="mdi:current-dc",
+    ),
+    "battery_power": SensorSpec(
+        name="Battery Power",
+        address=0x3106,
+        unit="W",
+        scale=0.01,
+        device_class="power",
+        state_class="measurement",
+        category="battery",
+        icon="mdi:battery-charging",
+        combine_registers=True,
+        high_address=0x3107,
+    ),
+    "battery_soc": SensorSpec(
+        name="Battery State of Charge",
+        address=0x311A,
+        unit="%",
+        scale=1,
+        device_class="battery",
+        state_class="measurement",
+        category="battery",
+        icon="mdi:battery-50",
+    ),
+    "battery_temp": SensorSpec(
+        name="Battery Temperature",
+        address=0x3110,
+        unit="°C",
+        scale=0.01,
+        offset=-273.15,
+        device_class="temperature",
+        state_class="measurement",
+        category="battery",
+        icon="mdi:thermometer",
+    ),
     
     # Load Parameters
-    "load_voltage": {
-        "name": "Load Voltage",
-        "address": 0x310C,
-        "unit": "V",
-        "scale": 0.01,
-        "device_class": "voltage",
-        "state_class": "measurement",
-        "category": "load",
-        "icon": "mdi:flash",
-    },
-    "load_current": {
-        "name": "Load Current",
-        "address": 0x310D,
-        "unit": "A",
-        "scale": 0.01,
-        "device_class": "current",
-        "state_class": "measurement",
-        "category": "load",
-        "icon": "mdi:current-ac",
-    },
-    "load_power": {
-        "name": "Load Power",
-        "address": 0x310A,
-        "unit": "W",
-        "scale": 0.01,
-        "device_class": "power",
-        "state_class": "measurement",
-        "category": "load",
-        "icon": "mdi:lightning-bolt",
-        "combine_registers": True,
-        "high_address": 0x310B,
-    },
+    "load_voltage": SensorSpec(
+        name="Load Voltage",
+        address=0x310C,
+        unit="V",
+        scale=0.01,
+        device_class="voltage",
+        state_class="measurement",
+        category="load",
+        icon="mdi:flash",
+    ),
+    "load_current": SensorSpec(
+        name="Load Current",
+        address=0x310D,
+        unit="A",
+        scale=0.01,
+        device_class="current",
+        state_class="measurement",
+        category="load",
+        icon="mdi:current-ac",
+    ),
+    "load_power": SensorSpec(
+        name="Load Power",
+        address=0x310A,
+        unit="W",
+        scale=0.01,
+        device_class="power",
+        state_class="measurement",
+        category="load",
+        icon="mdi:lightning-bolt",
+        combine_registers=True,
+        high_address=0x310B,
+    ),
     
     # System Parameters
-    "device_temp": {
-        "name": "Device Temperature",
-        "address": 0x3111,
-        "unit": "°C",
-        "scale": 0.01,
-        "offset": -273.15,
-        "device_class": "temperature",
-        "state_class": "measurement",
-        "category": "system",
-        "icon": "mdi:thermometer",
-    },
-    "heat_sink_temp": {
-        "name": "Heat Sink Temperature",
-        "address": 0x3113,
-        "unit": "°C",
-        "scale": 0.01,
-        "offset": -273.15,
-        "device_class": "temperature",
-        "state_class": "measurement",
-        "category": "system",
-        "icon": "mdi:thermometer",
-    },
+    "device_temp": SensorSpec(
+        name="Device Temperature",
+        address=0x3111,
+        unit="°C",
+        scale=0.01,
+        offset=-273.15,
+        device_class="temperature",
+        state_class="measurement",
+        category="system",
+        icon="mdi:thermometer",
+    ),
+    "heat_sink_temp": SensorSpec(
+        name="Heat Sink Temperature",
+        address=0x3113,
+        unit="°C",
+        scale=0.01,
+        offset=-273.15,
+        device_class="temperature",
+        state_class="measurement",
+        category="system",
+        icon="mdi:thermometer",
+    ),
     
     # Status Parameters
-    "battery_status": {
-        "name": "Battery Status",
-        "address": 0x3200,
-        "unit": "",
-        "scale": 1,
-        "category": "status",
-        "icon": "mdi:battery-alert",
-        "type": "status",
-    },
-    "charging_status": {
-        "name": "Charging Status",
-        "address": 0x3201,
-        "unit": "",
-        "scale": 1,
-        "category": "status",
-        "icon": "mdi:battery-charging",
-        "type": "status",
-    },
-    "load_status": {
-        "name": "Load Status",
-        "address": 0x3202,
-        "unit": "",
-        "scale": 1,
-        "category": "status",
-        "icon": "mdi:power-plug",
-        "type": "status",
-    },
+    "battery_status": SensorSpec(
+        name="Battery Status",
+        address=0x3200,
+        unit="",
+        scale=1,
+        category="status",
+        icon="mdi:battery-alert",
+        kind="status",
+    ),
+    "charging_status": SensorSpec(
+        name="Charging Status",
+        address=0x3201,
+        unit="",
+        scale=1,
+        category="status",
+        icon="mdi:battery-charging",
+        kind="status",
+    ),
+    "load_status": SensorSpec(
+        name="Load Status",
+        address=0x3202,
+        unit="",
+        scale=1,
+        category="status",
+        icon="mdi:power-plug",
+        kind="status",
+    ),
     
     # Energy Statistics
-    "energy_generated_today": {
-        "name": "Energy Generated Today",
-        "address": 0x3306,
-        "unit": "kWh",
-        "scale": 0.01,
-        "device_class": "energy",
-        "state_class": "total_increasing",
-        "category": "statistics",
-        "icon": "mdi:solar-power",
-        "combine_registers": True,
-        "high_address": 0x3307,
-    },
-    "energy_consumed_today": {
-        "name": "Energy Consumed Today",
-        "address": 0x3304,
-        "unit": "kWh",
-        "scale": 0.01,
-        "device_class": "energy",
-        "state_class": "total_increasing",
-        "category": "statistics",
-        "icon": "mdi:lightning-bolt",
-        "combine_registers": True,
-        "high_address": 0x3305,
-    },
-    "energy_generated_total": {
-        "name": "Total Energy Generated",
-        "address": 0x3308,
-        "unit": "kWh",
-        "scale": 0.01,
-        "device_class": "energy",
-        "state_class": "total_increasing",
-        "category": "statistics",
-        "icon": "mdi:counter",
-        "combine_registers": True,
-        "high_address": 0x3309,
-    },
-    "max_battery_voltage_today": {
-        "name": "Max Battery Voltage Today",
-        "address": 0x3302,
-        "unit": "V",
-        "scale": 0.01,
-        "device_class": "voltage",
-        "state_class": "measurement",
-        "category": "statistics",
-        "icon": "mdi:battery-arrow-up",
-    },
-    "min_battery_voltage_today": {
-        "name": "Min Battery Voltage Today",
-        "address": 0x3303,
-        "unit": "V",
-        "scale": 0.01,
-        "device_class": "voltage",
-        "state_class": "measurement",
-        "category": "statistics",
-        "icon": "mdi:battery-arrow-down",
-    },
-    "battery_full_charges": {
-        "name": "Battery Full Charges",
-        "address": 0x330C,
-        "unit": "cycles",
-        "scale": 1,
-        "state_class": "total_increasing",
-        "category": "statistics",
-        "icon": "mdi:battery-sync",
-    },
-    "operating_days": {
-        "name": "Operating Days",
-        "address": 0x330A,
-        "unit": "days",
-        "scale": 1,
-        "state_class": "total_increasing",
-        "category": "statistics",
-        "icon": "mdi:calendar-clock",
-    },
+    "energy_generated_today": SensorSpec(
+        name="Energy Generated Today",
+        address=0x3306,
+        unit="kWh",
+        scale=0.01,
+        device_class="energy",
+        state_class="total_increasing",
+        category="statistics",
+        icon="mdi:solar-power",
+        combine_registers=True,
+        high_address=0x3307,
+    ),
+    "energy_consumed_today": SensorSpec(
+        name="Energy Consumed Today",
+        address=0x3304,
+        unit="kWh",
+        scale=0.01,
+        device_class="energy",
+        state_class="total_increasing",
+        category="statistics",
+        icon="mdi:lightning-bolt",
+        combine_registers=True,
+        high_address=0x3305,
+    ),
+    "energy_generated_total": SensorSpec(
+        name="Total Energy Generated",
+        address=0x3308,
+        unit="kWh",
+        scale=0.01,
+        device_class="energy",
+        state_class="total_increasing",
+        category="statistics",
+        icon="mdi:counter",
+        combine_registers=True,
+        high_address=0x3309,
+    ),
+    "max_battery_voltage_today": SensorSpec(
+        name="Max Battery Voltage Today",
+        address=0x3302,
+        unit="V",
+        scale=0.01,
+        device_class="voltage",
+        state_class="measurement",
+        category="statistics",
+        icon="mdi:battery-arrow-up",
+    ),
+    "min_battery_voltage_today": SensorSpec(
+        name="Min Battery Voltage Today",
+        address=0x3303,
+        unit="V",
+        scale=0.01,
+        device_class="voltage",
+        state_class="measurement",
+        category="statistics",
+        icon="mdi:battery-arrow-down",
+    ),
+    "battery_full_charges": SensorSpec(
+        name="Battery Full Charges",
+        address=0x330C,
+        unit="cycles",
+        scale=1,
+        state_class="total_increasing",
+        category="statistics",
+        icon="mdi:battery-sync",
+    ),
+    "operating_days": SensorSpec(
+        name="Operating Days",
+        address=0x330A,
+        unit="days",
+        scale=1,
+        state_class="total_increasing",
+        category="statistics",
+        icon="mdi:calendar-clock",
+    ),
     
     # Configuration Parameters (read-only in HA)
-    "battery_type": {
-        "name": "Battery Type",
-        "address": 0x9000,
-        "unit": "",
-        "scale": 1,
-        "category": "config",
-        "icon": "mdi:battery-outline",
-        "type": "enum",
-        "enum_values": {0: "User Defined", 1: "Sealed", 2: "GEL", 3: "Flooded", 4: "LiFePO4"},
-    },
-    "battery_capacity": {
-        "name": "Battery Capacity",
-        "address": 0x9001,
-        "unit": "Ah",
-        "scale": 1,
-        "category": "config",
-        "icon": "mdi:battery-outline",
-    },
-    "float_voltage": {
-        "name": "Float Voltage Setting",
-        "address": 0x9008,
-        "unit": "V",
-        "scale": 0.01,
-        "device_class": "voltage",
-        "category": "config",
-        "icon": "mdi:sine-wave",
-    },
-    "low_voltage_disconnect": {
-        "name": "Low Voltage Disconnect Setting",
-        "address": 0x900D,
-        "unit": "V",
-        "scale": 0.01,
-        "device_class": "voltage",
-        "category": "config",
-        "icon": "mdi:battery-alert-variant",
-    },
+    "battery_type": SensorSpec(
+        name="Battery Type",
+        address=0x9000,
+        unit="",
+        scale=1,
+        category="config",
+        icon="mdi:battery-outline",
+        kind="enum",
+        enum_values=((0, "User Defined"), (1, "Sealed"), (2, "GEL"), (3, "Flooded"), (4, "LiFePO4")),
+    ),
+    "battery_capacity": SensorSpec(
+        name="Battery Capacity",
+        address=0x9001,
+        unit="Ah",
+        scale=1,
+        category="config",
+        icon="mdi:battery-outline",
+    ),
+    "float_voltage": SensorSpec(
+        name="Float Voltage Setting",
+        address=0x9008,
+        unit="V",
+        scale=0.01,
+        device_class="voltage",
+        category="config",
+        icon="mdi:sine-wave",
+    ),
+    "low_voltage_disconnect": SensorSpec(
+        name="Low Voltage Disconnect Setting",
+        address=0x900D,
+        unit="V",
+        scale=0.01,
+        device_class="voltage",
+        category="config",
+        icon="mdi:battery-alert-variant",
+    ),
 }
 
 # Status bit definitions for status sensors
@@ -340,3 +396,8 @@ LOAD_STATUS_BITS = {
     6: "Output Over Current",
     7: "Input Over Current"
 }
+
+# Precomputed (mask, description) pairs for formatting status bitfields
+BATTERY_STATUS_MASKS = tuple((1 << bit, desc) for bit, desc in BATTERY_STATUS_BITS.items())
+CHARGING_STATUS_MASKS = tuple((1 << bit, desc) for bit, desc in CHARGING_STATUS_BITS.items())
+LOAD_STATUS_MASKS = tuple((1 << bit, desc) for bit, desc in LOAD_STATUS_BITS.items())
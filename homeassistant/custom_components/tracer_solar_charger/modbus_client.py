@@ -4,11 +4,75 @@ import serial
 import struct
 import time
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    from fastcrc import crc16 as _fastcrc16
+except ImportError:  # Optional C accelerator, fall back to the lookup table
+    _fastcrc16 = None
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _compute_crc16_entry(value: int) -> int:
+    """Run the 8-bit poly-0xA001 reduction for a single table entry."""
+    crc = value
+    for _ in range(8):
+        if crc & 0x0001:
+            crc = (crc >> 1) ^ 0xA001
+        else:
+            crc >>= 1
+    return crc
+
+
+# Modbus RTU CRC16 lookup table, computed once at import
+_CRC16_TABLE = tuple(_compute_crc16_entry(i) for i in range(256))
+
+# Length of a Modbus exception response: slave, function | 0x80, code, CRC
+EXCEPTION_FRAME_SIZE = 5
+
+# Size of the receive buffer; larger than the biggest possible RTU frame
+RX_BUFFER_SIZE = 512
+
+# Largest register count allowed in a single FC03/FC04 request
+MAX_READ_REGISTERS = 125
+
+
+def coalesce_register_blocks(
+    blocks: List[Tuple[int, int]],
+    gap_threshold: int = 8,
+    max_count: int = MAX_READ_REGISTERS,
+) -> List[Tuple[int, int]]:
+    """Merge adjacent or nearby (start, count) blocks into fewer reads.
+
+    Blocks are merged when the gap between them is at most gap_threshold
+    registers and the merged read does not exceed max_count registers.
+    """
+    merged: List[Tuple[int, int]] = []
+    for start, count in sorted(blocks):
+        if merged:
+            prev_start, prev_count = merged[-1]
+            prev_end = prev_start + prev_count
+            new_end = max(prev_end, start + count)
+            if start - prev_end <= gap_threshold and new_end - prev_start <= max_count:
+                merged[-1] = (prev_start, new_end - prev_start)
+                continue
+        merged.append((start, count))
+    return merged
+
+
+# Compiled big-endian register layouts, keyed by register count
+_REGISTER_STRUCTS: Dict[int, struct.Struct] = {}
+
+
+def _register_struct(num_registers: int) -> struct.Struct:
+    """Return a cached Struct unpacking num_registers big-endian words."""
+    register_struct = _REGISTER_STRUCTS.get(num_registers)
+    if register_struct is None:
+        register_struct = _REGISTER_STRUCTS[num_registers] = struct.Struct(f'>{num_registers}H')
+    return register_struct
+
+
 class TracerModbusClient:
     """Simplified Modbus RTU client for Tracer solar charger."""
 
@@ -19,6 +83,14 @@ class TracerModbusClient:
         self.slave_id = slave_id
         self.timeout = timeout
         self.serial_conn = None
+        # Modbus RTU requires 3.5 character times (11 bits each) between frames
+        self._silent_interval = 3.5 * (11 / baudrate)
+        self._last_frame_time = 0.0
+        # Read commands are identical from one poll to the next, so build each once
+        self._cmd_cache: Dict[Tuple[int, int, int, int], bytes] = {}
+        # Responses are read into one reusable buffer and parsed in place
+        self._rx_buf = bytearray(RX_BUFFER_SIZE)
+        self._rx_view = memoryview(self._rx_buf)
 
     def __enter__(self):
         """Context manager entry."""
@@ -52,30 +124,43 @@ class TracerModbusClient:
             self.serial_conn.close()
             _LOGGER.debug("Disconnected from %s", self.port)
 
+    @property
+    def is_connected(self) -> bool:
+        """Return True if the serial port is open."""
+        return bool(self.serial_conn and self.serial_conn.is_open)
+
     def calculate_crc16(self, data: bytes) -> bytes:
         """Calculate Modbus RTU CRC16."""
+        if _fastcrc16 is not None:
+            return struct.pack('<H', _fastcrc16.modbus(bytes(data)))
+
         crc = 0xFFFF
         for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                if crc & 0x0001:
-                    crc >>= 1
-                    crc ^= 0xA001
-                else:
-                    crc >>= 1
+            crc = (crc >> 8) ^ _CRC16_TABLE[(crc ^ byte) & 0xFF]
         return struct.pack('<H', crc)
 
     def create_modbus_command(self, function_code: int, start_addr: int, num_registers: int) -> bytes:
         """Create a Modbus RTU command with CRC."""
-        data = struct.pack('>BBHH', self.slave_id, function_code, start_addr, num_registers)
-        crc = self.calculate_crc16(data)
-        return data + crc
-
-    def parse_modbus_response(self, response: bytes) -> Optional[Dict]:
-        """Parse Modbus RTU response."""
+        key = (self.slave_id, function_code, start_addr, num_registers)
+        cmd = self._cmd_cache.get(key)
+        if cmd is None:
+            data = struct.pack('>BBHH', self.slave_id, function_code, start_addr, num_registers)
+            cmd = self._cmd_cache[key] = data + self.calculate_crc16(data)
+        return cmd
+
+    def parse_modbus_response(self, response: Union[bytes, memoryview]) -> Optional[Dict]:
+        """Parse Modbus RTU response.
+
+        Returns None for truncated frames, frames whose byte count does not
+        match their length, and frames with a bad CRC.
+        """
         if len(response) < 5:
             return None
 
+        if self.calculate_crc16(response[:-2]) != response[-2:]:
+            _LOGGER.debug("CRC mismatch in response from slave %d", response[0])
+            return None
+
         slave_id = response[0]
         function_code = response[1]
 
@@ -83,19 +168,21 @@ class TracerModbusClient:
         if function_code & 0x80:
             error_code = response[2]
             _LOGGER.warning("Modbus error %d from slave %d", error_code, slave_id)
-            return None
+            return {
+                'slave_id': slave_id,
+                'function_code': function_code & 0x7F,
+                'error_code': error_code,
+            }
 
         # Parse successful response
         if function_code in [0x03, 0x04]:  # Read holding/input registers
             byte_count = response[2]
-            data = response[3:3+byte_count]
+            if len(response) != 5 + byte_count or byte_count % 2:
+                _LOGGER.debug("Byte count %d does not match response length %d", byte_count, len(response))
+                return None
 
-            # Parse 16-bit registers
-            registers = []
-            for i in range(0, len(data), 2):
-                if i + 1 < len(data):
-                    reg_value = struct.unpack('>H', data[i:i+2])[0]
-                    registers.append(reg_value)
+            # Parse all 16-bit registers in a single unpack
+            registers = list(_register_struct(byte_count // 2).unpack_from(response, 3))
 
             return {
                 'slave_id': slave_id,
@@ -106,37 +193,75 @@ class TracerModbusClient:
         return None
 
     def read_registers(self, function_code: int, start_addr: int, num_registers: int = 1) -> Optional[List[int]]:
-        """Read registers from device."""
+        """Read registers from device.
+
+        A malformed response (bad length or CRC) is retried once immediately
+        rather than waiting for the next update.
+        """
         if not self.serial_conn or not self.serial_conn.is_open:
             _LOGGER.error("Serial connection not established")
             return None
 
         try:
-            # Create and send command
+            # Create command
             cmd = self.create_modbus_command(function_code, start_addr, num_registers)
 
-            self.serial_conn.reset_input_buffer()
-            self.serial_conn.write(cmd)
-            time.sleep(0.05)  # Brief delay for response
+            for attempt in range(2):
+                self.serial_conn.reset_input_buffer()
+                self._wait_silent_interval()
+                self.serial_conn.write(cmd)
 
-            # Read response
-            response = self.serial_conn.read(self.serial_conn.in_waiting or (5 + num_registers * 2))
+                # Read exactly one response frame: slave, function, byte count, data, CRC
+                response = self._read_response(5 + num_registers * 2)
 
-            if not response:
-                _LOGGER.warning("No response from device for address 0x%04X", start_addr)
-                return None
+                if not response:
+                    _LOGGER.warning("No response from device for address 0x%04X", start_addr)
+                    return None
 
-            # Parse response
-            parsed = self.parse_modbus_response(response)
+                # Parse response
+                parsed = self.parse_modbus_response(response)
 
-            if parsed and 'registers' in parsed:
-                return parsed['registers']
+                if parsed is None:
+                    _LOGGER.debug("Invalid response for address 0x%04X (attempt %d)", start_addr, attempt + 1)
+                    continue
 
+                return parsed.get('registers')
+
+            _LOGGER.warning("Invalid response from device for address 0x%04X", start_addr)
+
+        except serial.SerialException:
+            # Port-level failures are left to the caller so it can reconnect
+            raise
         except Exception as err:
             _LOGGER.error("Error reading registers 0x%04X: %s", start_addr, err)
 
         return None
 
+    def _wait_silent_interval(self):
+        """Keep the inter-frame silent interval before sending a request."""
+        remaining = self._last_frame_time + self._silent_interval - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def _read_response(self, expected_len: int) -> memoryview:
+        """Read a response frame of expected_len bytes into the receive buffer.
+
+        The first EXCEPTION_FRAME_SIZE bytes are read on their own so that a
+        short exception response is returned without waiting for the serial
+        timeout. The returned view is only valid until the next read.
+        """
+        expected_len = min(expected_len, RX_BUFFER_SIZE)
+        view = self._rx_view
+        received = self.serial_conn.readinto(view[:EXCEPTION_FRAME_SIZE]) or 0
+        if (
+            received == EXCEPTION_FRAME_SIZE
+            and not view[1] & 0x80
+            and expected_len > EXCEPTION_FRAME_SIZE
+        ):
+            received += self.serial_conn.readinto(view[EXCEPTION_FRAME_SIZE:expected_len]) or 0
+        self._last_frame_time = time.monotonic()
+        return view[:received]
+
     def read_input_registers(self, start_addr: int, num_registers: int = 1) -> Optional[List[int]]:
         """Read input registers (Function Code 04)."""
         return self.read_registers(0x04, start_addr, num_registers)
@@ -0,0 +1,65 @@
+"""Contiguous register storage for Tracer Solar Charger coordinator data."""
+
+from array import array
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+
+class RegisterLayout:
+    """Fixed mapping of register addresses to offsets in a flat array."""
+
+    def __init__(self, blocks: List[Tuple[int, int]]) -> None:
+        """Assign consecutive offsets to each (start, count) block."""
+        self.blocks = list(blocks)
+        self.offsets: Dict[int, int] = {}
+        size = 0
+        for start, count in self.blocks:
+            for i in range(count):
+                self.offsets.setdefault(start + i, size + i)
+            size += count
+        self.size = size
+
+    def index_of(self, address: Optional[int]) -> Optional[int]:
+        """Return the array offset of address, or None if it is not read."""
+        return self.offsets.get(address)
+
+
+class RegisterData:
+    """Register values from one update, stored as a flat array of words."""
+
+    __slots__ = ("layout", "values", "present")
+
+    def __init__(self, layout: RegisterLayout) -> None:
+        """Allocate storage for every register in the layout."""
+        self.layout = layout
+        self.values = array('H', [0]) * layout.size
+        self.present = bytearray(layout.size)
+
+    def set_block(self, start_addr: int, registers: List[int]) -> None:
+        """Store a block of registers read starting at start_addr."""
+        offset = self.layout.offsets[start_addr]
+        count = len(registers)
+        self.values[offset:offset + count] = array('H', registers)
+        self.present[offset:offset + count] = b'\x01' * count
+
+    def at(self, index: Optional[int]) -> Optional[int]:
+        """Return the register value stored at index, or None if it was not read."""
+        if index is None or not self.present[index]:
+            return None
+        return self.values[index]
+
+    def get(self, address: int, default: Optional[int] = None) -> Optional[int]:
+        """Return the value of the register at address."""
+        value = self.at(self.layout.index_of(address))
+        return default if value is None else value
+
+    def present_offsets(self) -> FrozenSet[int]:
+        """Return the offsets of every register that was read."""
+        return frozenset(i for i, flag in enumerate(self.present) if flag)
+
+    def __contains__(self, address: int) -> bool:
+        """Return True if the register at address was read."""
+        return self.at(self.layout.index_of(address)) is not None
+
+    def __bool__(self) -> bool:
+        """Return True if any register was read."""
+        return any(self.present)
@@ -1,7 +1,8 @@
 """Sensor platform for Tracer Solar Charger integration."""
 
 import logging
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -20,26 +21,43 @@ from .const import (
     MANUFACTURER,
     MODEL,
     SENSOR_TYPES,
-    BATTERY_STATUS_BITS,
-    CHARGING_STATUS_BITS,
-    LOAD_STATUS_BITS,
+    SensorSpec,
+    BATTERY_STATUS_MASKS,
+    CHARGING_STATUS_MASKS,
+    LOAD_STATUS_MASKS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _format_bitfield(value: int, bit_masks: Tuple[Tuple[int, str], ...]) -> str:
+    """Format a bitfield value using precomputed (mask, description) pairs."""
+    active_bits = [description for mask, description in bit_masks if value & mask]
+    return ", ".join(active_bits) if active_bits else "Normal"
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Tracer Solar Charger sensors from config entry."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    coordinators = hass.data[DOMAIN][config_entry.entry_id]
     
     entities = []
     
-    # Create sensor entities for each sensor type
+    # Create sensor entities for each sensor type, attached to the
+    # coordinator that polls the sensor's register
     for sensor_key, sensor_config in SENSOR_TYPES.items():
+        coordinator = next(
+            (c for c in coordinators if c.layout.index_of(sensor_config.address) is not None),
+            None,
+        )
+        if coordinator is None:
+            _LOGGER.warning("No coordinator reads register 0x%04X for %s", sensor_config.address, sensor_key)
+            continue
+        
         entities.append(
             TracerSolarChargerSensor(
                 coordinator=coordinator,
@@ -49,7 +67,8 @@ async def async_setup_entry(
             )
         )
     
-    async_add_entities(entities, True)
+    # The first refresh is already running; don't queue another one
+    async_add_entities(entities, False)
 
 
 class TracerSolarChargerSensor(CoordinatorEntity, SensorEntity):
@@ -60,7 +79,7 @@ class TracerSolarChargerSensor(CoordinatorEntity, SensorEntity):
         coordinator,
         config_entry: ConfigEntry,
         sensor_key: str,
-        sensor_config: Dict[str, Any],
+        sensor_config: SensorSpec,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -68,19 +87,40 @@ class TracerSolarChargerSensor(CoordinatorEntity, SensorEntity):
         self._config_entry = config_entry
         self._sensor_key = sensor_key
         self._sensor_config = sensor_config
-        self._attr_name = f"Solar Charger {sensor_config['name']}"
+        self._attr_name = f"Solar Charger {sensor_config.name}"
         self._attr_unique_id = f"{config_entry.entry_id}_{sensor_key}"
         
+        # Hoist the per-update lookups out of the sensor config
+        self._addr = sensor_config.address
+        self._base_attrs = {
+            "category": sensor_config.category,
+            "address": f"0x{self._addr:04X}",
+        }
+        self._combine = sensor_config.combine_registers
+        self._high_addr = sensor_config.high_address
+        self._scale = sensor_config.scale
+        self._offset = sensor_config.offset
+        self._kind = sensor_config.kind
+        self._enum = dict(sensor_config.enum_values)
+        
+        # Offsets of the registers in the coordinator's flat register array
+        self._idx = coordinator.layout.index_of(self._addr)
+        self._high_idx = coordinator.layout.index_of(self._high_addr)
+        
+        # Last raw register value and the state computed from it
+        self._cache_raw = None
+        self._cache_val = None
+        
         # Set device class and state class
-        if "device_class" in sensor_config:
-            self._attr_device_class = getattr(SensorDeviceClass, sensor_config["device_class"].upper(), None)
+        if sensor_config.device_class:
+            self._attr_device_class = getattr(SensorDeviceClass, sensor_config.device_class.upper(), None)
         
-        if "state_class" in sensor_config:
-            self._attr_state_class = getattr(SensorStateClass, sensor_config["state_class"].upper(), None)
+        if sensor_config.state_class:
+            self._attr_state_class = getattr(SensorStateClass, sensor_config.state_class.upper(), None)
         
         # Set unit and icon
-        self._attr_native_unit_of_measurement = sensor_config.get("unit")
-        self._attr_icon = sensor_config.get("icon")
+        self._attr_native_unit_of_measurement = sensor_config.unit
+        self._attr_icon = sensor_config.icon
         
         # Set device info
         self._attr_device_info = DeviceInfo(
@@ -98,79 +138,63 @@ class TracerSolarChargerSensor(CoordinatorEntity, SensorEntity):
         if not self.coordinator.data:
             return None
         
-        address = self._sensor_config["address"]
-        raw_value = self.coordinator.data.get(address)
+        data = self.coordinator.data
+        raw_value = data.at(self._idx)
         
         if raw_value is None:
             return None
         
         # Handle combined registers (32-bit values)
-        if self._sensor_config.get("combine_registers"):
-            high_address = self._sensor_config.get("high_address")
-            high_value = self.coordinator.data.get(high_address, 0)
+        if self._combine:
+            high_value = data.at(self._high_idx) or 0
             # Combine low and high words into 32-bit value
-            combined_value = (high_value << 16) | raw_value
-            raw_value = combined_value
+            raw_value = (high_value << 16) | raw_value
         
-        # Handle status/enum types
-        if self._sensor_config.get("type") == "status":
-            return self._format_status_value(raw_value)
-        elif self._sensor_config.get("type") == "enum":
-            enum_values = self._sensor_config.get("enum_values", {})
-            return enum_values.get(raw_value, f"Unknown ({raw_value})")
-        
-        # Apply scaling
-        scaled_value = raw_value * self._sensor_config.get("scale", 1)
+        # Register values are often unchanged between updates
+        if raw_value == self._cache_raw:
+            return self._cache_val
         
-        # Apply offset if present (for temperature conversions)
-        if "offset" in self._sensor_config:
-            scaled_value += self._sensor_config["offset"]
+        # Handle status/enum types
+        if self._kind == "status":
+            value = self._format_status_value(raw_value)
+        elif self._kind == "enum":
+            value = self._enum.get(raw_value, f"Unknown ({raw_value})")
+        else:
+            # Apply scaling and offset (for temperature conversions)
+            value = round(raw_value * self._scale + self._offset, 2)
         
-        return round(scaled_value, 2)
+        self._cache_raw = raw_value
+        self._cache_val = value
+        return value
 
     def _format_status_value(self, raw_value: int) -> str:
         """Format status register values as human-readable text."""
         if self._sensor_key == "battery_status":
-            return self._format_bitfield(raw_value, BATTERY_STATUS_BITS)
+            return _format_bitfield(raw_value, BATTERY_STATUS_MASKS)
         elif self._sensor_key == "charging_status":
-            return self._format_bitfield(raw_value, CHARGING_STATUS_BITS)
+            return _format_bitfield(raw_value, CHARGING_STATUS_MASKS)
         elif self._sensor_key == "load_status":
-            return self._format_bitfield(raw_value, LOAD_STATUS_BITS)
+            return _format_bitfield(raw_value, LOAD_STATUS_MASKS)
         else:
             return str(raw_value)
 
-    def _format_bitfield(self, value: int, bit_definitions: Dict[int, str]) -> str:
-        """Format a bitfield value using bit definitions."""
-        active_bits = []
-        for bit, description in bit_definitions.items():
-            if value & (1 << bit):
-                active_bits.append(description)
-        
-        return ", ".join(active_bits) if active_bits else "Normal"
-
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return additional state attributes."""
-        attributes = {
-            "category": self._sensor_config.get("category"),
-            "address": f"0x{self._sensor_config['address']:04X}",
-        }
-        
         # Add raw value for debugging
         if self.coordinator.data:
-            raw_value = self.coordinator.data.get(self._sensor_config["address"])
+            raw_value = self.coordinator.data.at(self._idx)
             if raw_value is not None:
-                attributes["raw_value"] = raw_value
+                return {**self._base_attrs, "raw_value": raw_value}
         
-        return attributes
+        return self._base_attrs
 
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
         return (
             self.coordinator.last_update_success
-            and self.coordinator.data is not None
-            and self._sensor_config["address"] in self.coordinator.data
+            and self._idx in self.coordinator.present_offsets
         )
 
     @callback
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Optional native extensions for the Solar Charger Interface
+
+Build in place with: python setup.py build_ext --inplace
+The CLI works without them, falling back to pure Python implementations.
+"""
+
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+extensions = [
+    Extension('communication._crc16', ['src/communication/_crc16.pyx']),
+]
+
+setup(
+    name='solar-charger-extensions',
+    package_dir={'': 'src'},
+    ext_modules=cythonize(extensions),
+)
@@ -0,0 +1,40 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Cython implementation of the Modbus RTU CRC16
+Build with: python setup.py build_ext --inplace
+"""
+
+from cpython.bytes cimport PyBytes_FromStringAndSize
+
+cdef unsigned short _CRC16_TABLE[256]
+
+
+cdef void _build_crc16_table():
+    """Build the Modbus RTU CRC16 (poly 0xA001) lookup table"""
+    cdef unsigned int byte, bit
+    cdef unsigned short crc
+    for byte in range(256):
+        crc = byte
+        for bit in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        _CRC16_TABLE[byte] = crc
+
+
+_build_crc16_table()
+
+
+cpdef bytes crc16_modbus(const unsigned char[::1] data):
+    """Calculate Modbus RTU CRC16, returned as 2 little-endian bytes"""
+    cdef unsigned short crc = 0xFFFF
+    cdef Py_ssize_t i
+    cdef char out[2]
+
+    for i in range(data.shape[0]):
+        crc = (crc >> 8) ^ _CRC16_TABLE[(crc ^ data[i]) & 0xFF]
+
+    out[0] = <char>(crc & 0xFF)
+    out[1] = <char>(crc >> 8)
+    return PyBytes_FromStringAndSize(out, 2)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Asyncio Modbus RTU Client for Tracer3210AN Solar Charger
+Same framing as ModbusRTUClient, but transactions await the serial port
+instead of blocking the caller (requires pyserial-asyncio)
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+import serial
+
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
+from .modbus_client import (
+    ModbusFraming, MAX_READ_REGISTERS, _CMD_STRUCT, _WR_HEADER_STRUCT, _register_struct,
+)
+
+_log = logging.getLogger(__name__)
+
+
+class AsyncModbusRTUClient(ModbusFraming):
+    """Asyncio Modbus RTU client for solar charger communication
+
+    Shares the framing of ModbusRTUClient but is not a drop-in for it: every
+    I/O method is a coroutine. One transaction runs at a time per port;
+    clients on different ports overlap freely in the same event loop.
+    """
+
+    def __init__(self, port: str, baudrate: int = 115200, slave_id: int = 1, timeout: float = 1.0):
+        super().__init__(slave_id)
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        """True while the serial stream is open"""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> bool:
+        """Establish serial connection"""
+        if serial_asyncio is None:
+            _log.error("pyserial-asyncio is required for AsyncModbusRTUClient")
+            return False
+
+        try:
+            self._reader, self._writer = await serial_asyncio.open_serial_connection(
+                url=self.port,
+                baudrate=self.baudrate,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                bytesize=serial.EIGHTBITS
+            )
+            return True
+        except Exception as e:
+            _log.error("Failed to connect to %s: %s", self.port, e)
+            return False
+
+    async def disconnect(self):
+        """Close serial connection"""
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._reader = self._writer = None
+
+    async def __aenter__(self):
+        """Async context manager entry"""
+        if await self.connect():
+            return self
+        raise ConnectionError(f"Failed to connect to {self.port}")
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.disconnect()
+
+    async def _transaction(self, cmd: bytes, expected_len: int) -> Optional[Dict]:
+        """Send one request and return the parsed response frame"""
+        async with self._lock:
+            # Checked under the lock: a failed resync by the previous
+            # transaction leaves the stream closed
+            if not self.is_connected:
+                raise ConnectionError("Serial connection not established")
+
+            # Like the blocking client, drop anything the port received unasked
+            port = getattr(self._writer.transport, 'serial', None)
+            if port is not None:
+                port.reset_input_buffer()
+            self._writer.write(cmd)
+            await self._writer.drain()
+            try:
+                response = await asyncio.wait_for(self._read_frame(expected_len), self.timeout)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                # A late or partial reply would be read as the next response
+                await self._resync()
+                raise
+
+            parsed = self.parse_modbus_response(response)
+            if parsed is None:
+                await self._resync()
+        return parsed
+
+    async def _resync(self):
+        """Reopen the serial stream, discarding bytes of an abandoned reply already buffered by the reader"""
+        _log.info("Reopening %s to discard unread response bytes", self.port)
+        await self.disconnect()
+        await self.connect()
+
+    async def _read_frame(self, expected_len: int) -> bytes:
+        """Read one complete response frame, sized from its header"""
+        header = await self._reader.readexactly(3)
+
+        function_code = header[1]
+        if function_code & 0x80:
+            remaining = 2
+        elif function_code in (0x03, 0x04):
+            remaining = header[2] + 2
+        else:
+            remaining = expected_len - 3
+
+        return header + await self._reader.readexactly(remaining)
+
+    async def read_registers(self, function_code: int, start_addr: int, num_registers: int = 1) -> Optional[List[int]]:
+        """Read registers from device"""
+        cmd = self.create_modbus_command(function_code, start_addr, num_registers)
+
+        try:
+            parsed = await self._transaction(cmd, 5 + num_registers * 2)
+        except ConnectionError:
+            raise
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, serial.SerialException) as e:
+            _log.warning("Error reading registers 0x%04X: %s", start_addr, e)
+            return None
+
+        return self._check_read_reply(parsed, function_code, start_addr, num_registers)
+
+    async def read_input_registers(self, start_addr: int, num_registers: int = 1) -> Optional[List[int]]:
+        """Read input registers (Function Code 04)"""
+        return await self.read_registers(0x04, start_addr, num_registers)
+
+    async def read_holding_registers(self, start_addr: int, num_registers: int = 1) -> Optional[List[int]]:
+        """Read holding registers (Function Code 03)"""
+        return await self.read_registers(0x03, start_addr, num_registers)
+
+    async def read_single_register(self, address: int, is_holding: bool = False) -> Optional[int]:
+        """Read a single register"""
+        result = await self.read_registers(0x03 if is_holding else 0x04, address, 1)
+        return result[0] if result else None
+
+    async def read_register_block(self, start_addr: int, count: int, is_holding: bool = False) -> Optional[Dict[int, int]]:
+        """Read a block of consecutive registers efficiently"""
+        values = await self.read_registers(0x03 if is_holding else 0x04, start_addr, count)
+        if values:
+            return {start_addr + i: values[i] for i in range(len(values))}
+        return None
+
+    async def read_registers_coalesced(self, addresses: List[int], is_holding: bool = False,
+                                       gap_threshold: int = 4) -> Dict[int, int]:
+        """Read scattered registers using as few block reads as possible"""
+        wanted = sorted(set(addresses))
+        results = {}
+
+        i = 0
+        while i < len(wanted):
+            run_start = run_end = wanted[i]
+            j = i + 1
+            while (j < len(wanted) and wanted[j] - run_end <= gap_threshold
+                   and wanted[j] - run_start < MAX_READ_REGISTERS):
+                run_end = wanted[j]
+                j += 1
+
+            block = await self.read_register_block(run_start, run_end - run_start + 1, is_holding)
+            if block:
+                for addr in wanted[i:j]:
+                    if addr in block:
+                        results[addr] = block[addr]
+            i = j
+
+        return results
+
+    async def _write(self, cmd: bytes, function_code: int, start_addr: int, value: int) -> bool:
+        """Send a write request and check its acknowledgement"""
+        try:
+            parsed = await self._transaction(cmd, 8)
+        except ConnectionError:
+            raise
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, serial.SerialException) as e:
+            self.last_error_code = None
+            _log.warning("Error writing registers starting at 0x%04X: %s", start_addr, e)
+            return False
+
+        return self._check_write_reply(parsed, function_code, start_addr, value)
+
+    async def write_single_register(self, address: int, value: int) -> bool:
+        """Write a single holding register (Function Code 06)"""
+        data = _CMD_STRUCT.pack(self.slave_id, 0x06, address, value)
+        return await self._write(data + self.calculate_crc16(data), 0x06, address, value)
+
+    async def write_multiple_registers(self, start_addr: int, values: List[int]) -> bool:
+        """Write multiple holding registers (Function Code 16)"""
+        num_registers = len(values)
+        data = (_WR_HEADER_STRUCT.pack(self.slave_id, 0x10, start_addr, num_registers, num_registers * 2)
+                + _register_struct(num_registers).pack(*values))
+        return await self._write(data + self.calculate_crc16(data), 0x10, start_addr, num_registers)
+
+    async def test_connection(self) -> bool:
+        """Test connection by reading a known register"""
+        try:
+            return await self.read_input_registers(0x3104, 1) is not None
+        except ConnectionError:
+            return False
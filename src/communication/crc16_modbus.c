@@ -0,0 +1,157 @@
+/*
+ * Modbus RTU CRC16 (poly 0xA001) for ModbusRTUClient, loaded through ctypes
+ * Build with: gcc -O2 -shared -fPIC -o src/communication/libmodbuscrc.so src/communication/crc16_modbus.c
+ *
+ * The implementation is selected once when the library is loaded: on x86
+ * CPUs with PCLMULQDQ, buffers of CLMUL_MIN_LEN bytes or more are folded
+ * 16 bytes at a time with carry-less multiplication; everything else uses
+ * slice-by-8 table lookups.
+ */
+
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+#define HAVE_CLMUL 1
+#endif
+
+/* Shorter buffers are not worth the setup cost of the CLMUL path */
+#define CLMUL_MIN_LEN 32
+
+static const uint16_t crc16_table[256] = {
+    0x0000, 0xC0C1, 0xC181, 0x0140, 0xC301, 0x03C0, 0x0280, 0xC241,
+    0xC601, 0x06C0, 0x0780, 0xC741, 0x0500, 0xC5C1, 0xC481, 0x0440,
+    0xCC01, 0x0CC0, 0x0D80, 0xCD41, 0x0F00, 0xCFC1, 0xCE81, 0x0E40,
+    0x0A00, 0xCAC1, 0xCB81, 0x0B40, 0xC901, 0x09C0, 0x0880, 0xC841,
+    0xD801, 0x18C0, 0x1980, 0xD941, 0x1B00, 0xDBC1, 0xDA81, 0x1A40,
+    0x1E00, 0xDEC1, 0xDF81, 0x1F40, 0xDD01, 0x1DC0, 0x1C80, 0xDC41,
+    0x1400, 0xD4C1, 0xD581, 0x1540, 0xD701, 0x17C0, 0x1680, 0xD641,
+    0xD201, 0x12C0, 0x1380, 0xD341, 0x1100, 0xD1C1, 0xD081, 0x1040,
+    0xF001, 0x30C0, 0x3180, 0xF141, 0x3300, 0xF3C1, 0xF281, 0x3240,
+    0x3600, 0xF6C1, 0xF781, 0x3740, 0xF501, 0x35C0, 0x3480, 0xF441,
+    0x3C00, 0xFCC1, 0xFD81, 0x3D40, 0xFF01, 0x3FC0, 0x3E80, 0xFE41,
+    0xFA01, 0x3AC0, 0x3B80, 0xFB41, 0x3900, 0xF9C1, 0xF881, 0x3840,
+    0x2800, 0xE8C1, 0xE981, 0x2940, 0xEB01, 0x2BC0, 0x2A80, 0xEA41,
+    0xEE01, 0x2EC0, 0x2F80, 0xEF41, 0x2D00, 0xEDC1, 0xEC81, 0x2C40,
+    0xE401, 0x24C0, 0x2580, 0xE541, 0x2700, 0xE7C1, 0xE681, 0x2640,
+    0x2200, 0xE2C1, 0xE381, 0x2340, 0xE101, 0x21C0, 0x2080, 0xE041,
+    0xA001, 0x60C0, 0x6180, 0xA141, 0x6300, 0xA3C1, 0xA281, 0x6240,
+    0x6600, 0xA6C1, 0xA781, 0x6740, 0xA501, 0x65C0, 0x6480, 0xA441,
+    0x6C00, 0xACC1, 0xAD81, 0x6D40, 0xAF01, 0x6FC0, 0x6E80, 0xAE41,
+    0xAA01, 0x6AC0, 0x6B80, 0xAB41, 0x6900, 0xA9C1, 0xA881, 0x6840,
+    0x7800, 0xB8C1, 0xB981, 0x7940, 0xBB01, 0x7BC0, 0x7A80, 0xBA41,
+    0xBE01, 0x7EC0, 0x7F80, 0xBF41, 0x7D00, 0xBDC1, 0xBC81, 0x7C40,
+    0xB401, 0x74C0, 0x7580, 0xB541, 0x7700, 0xB7C1, 0xB681, 0x7640,
+    0x7200, 0xB2C1, 0xB381, 0x7340, 0xB101, 0x71C0, 0x7080, 0xB041,
+    0x5000, 0x90C1, 0x9181, 0x5140, 0x9301, 0x53C0, 0x5280, 0x9241,
+    0x9601, 0x56C0, 0x5780, 0x9741, 0x5500, 0x95C1, 0x9481, 0x5440,
+    0x9C01, 0x5CC0, 0x5D80, 0x9D41, 0x5F00, 0x9FC1, 0x9E81, 0x5E40,
+    0x5A00, 0x9AC1, 0x9B81, 0x5B40, 0x9901, 0x59C0, 0x5880, 0x9841,
+    0x8801, 0x48C0, 0x4980, 0x8941, 0x4B00, 0x8BC1, 0x8A81, 0x4A40,
+    0x4E00, 0x8EC1, 0x8F81, 0x4F40, 0x8D01, 0x4DC0, 0x4C80, 0x8C41,
+    0x4400, 0x84C1, 0x8581, 0x4540, 0x8701, 0x47C0, 0x4680, 0x8641,
+    0x8201, 0x42C0, 0x4380, 0x8341, 0x4100, 0x81C1, 0x8081, 0x4040,
+};
+
+/* crc16_slice[k][b]: CRC contribution of byte b followed by k zero bytes */
+static uint16_t crc16_slice[8][256];
+
+static uint16_t (*crc16_impl)(uint16_t crc, const uint8_t *data, size_t n);
+
+static uint16_t crc16_bytes(uint16_t crc, const uint8_t *data, size_t n)
+{
+    size_t i;
+
+    for (i = 0; i < n; i++) {
+        crc = (crc >> 8) ^ crc16_table[(crc ^ data[i]) & 0xFF];
+    }
+    return crc;
+}
+
+static uint16_t crc16_slice8(uint16_t crc, const uint8_t *data, size_t n)
+{
+    while (n >= 8) {
+        crc = crc16_slice[7][(data[0] ^ crc) & 0xFF] ^
+              crc16_slice[6][(data[1] ^ (crc >> 8)) & 0xFF] ^
+              crc16_slice[5][data[2]] ^
+              crc16_slice[4][data[3]] ^
+              crc16_slice[3][data[4]] ^
+              crc16_slice[2][data[5]] ^
+              crc16_slice[1][data[6]] ^
+              crc16_slice[0][data[7]];
+        data += 8;
+        n -= 8;
+    }
+    return crc16_bytes(crc, data, n);
+}
+
+#ifdef HAVE_CLMUL
+/*
+ * Fold 16-byte blocks with carry-less multiplication. Messages are kept
+ * bit-reflected, so the folding constants are x^191 mod P and x^127 mod P
+ * (P = x^16 + x^15 + x^2 + 1), bit-reflected to 64 bits; the exponents are
+ * one less than the 192/128-bit shifts to absorb the extra shift of a
+ * reflected carry-less product. The folded 16-byte remainder is congruent
+ * to the message so far, and is finished with the table method.
+ */
+__attribute__((target("pclmul,sse2")))
+static uint16_t crc16_clmul(uint16_t crc, const uint8_t *data, size_t n)
+{
+    const __m128i k = _mm_set_epi64x((long long)0xC100000000000000ULL,
+                                     (long long)0xCCD0000000000000ULL);
+    __m128i state;
+    uint8_t folded[16];
+
+    if (n < CLMUL_MIN_LEN) {
+        return crc16_slice8(crc, data, n);
+    }
+
+    /* Seeding the register is the same as XORing it into the first bytes */
+    state = _mm_xor_si128(_mm_loadu_si128((const __m128i *)data),
+                          _mm_cvtsi32_si128(crc));
+    data += 16;
+    n -= 16;
+
+    while (n >= 16) {
+        state = _mm_xor_si128(
+            _mm_xor_si128(_mm_clmulepi64_si128(state, k, 0x00),
+                          _mm_clmulepi64_si128(state, k, 0x11)),
+            _mm_loadu_si128((const __m128i *)data));
+        data += 16;
+        n -= 16;
+    }
+
+    _mm_storeu_si128((__m128i *)folded, state);
+    crc = crc16_slice8(0, folded, sizeof(folded));
+    return crc16_slice8(crc, data, n);
+}
+#endif
+
+__attribute__((constructor))
+static void crc16_init(void)
+{
+    int i, k;
+
+    memcpy(crc16_slice[0], crc16_table, sizeof(crc16_table));
+    for (k = 1; k < 8; k++) {
+        for (i = 0; i < 256; i++) {
+            uint16_t prev = crc16_slice[k - 1][i];
+            crc16_slice[k][i] = (prev >> 8) ^ crc16_table[prev & 0xFF];
+        }
+    }
+
+    crc16_impl = crc16_slice8;
+#ifdef HAVE_CLMUL
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("pclmul")) {
+        crc16_impl = crc16_clmul;
+    }
+#endif
+}
+
+uint16_t crc16_modbus(const uint8_t *data, size_t n)
+{
+    return crc16_impl(0xFFFF, data, n);
+}
@@ -4,74 +4,127 @@ Modbus RTU Client for Tracer3210AN Solar Charger
 Handles all Modbus communication with proper CRC and error handling
 """
 
+import ctypes
+import logging
+import os
 import serial
 import struct
-import time
-from typing import List, Dict, Optional, Union
+from array import array
+from typing import List, Dict, Optional, Tuple, Union
 from binascii import hexlify
 
-class ModbusRTUClient:
-    """Modbus RTU client for solar charger communication"""
-    
-    def __init__(self, port: str, baudrate: int = 115200, slave_id: int = 1, timeout: float = 1.0):
-        self.port = port
-        self.baudrate = baudrate
-        self.slave_id = slave_id
-        self.timeout = timeout
-        self.serial_conn = None
-        
-    def connect(self) -> bool:
-        """Establish serial connection"""
-        try:
-            self.serial_conn = serial.Serial(
-                port=self.port,
-                baudrate=self.baudrate,
-                timeout=self.timeout,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE,
-                bytesize=serial.EIGHTBITS
-            )
-            return True
-        except Exception as e:
-            print(f"Failed to connect to {self.port}: {e}")
-            return False
-    
-    def disconnect(self):
-        """Close serial connection"""
-        if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close()
+_log = logging.getLogger(__name__)
+
+
+def _build_crc16_table() -> array:
+    """Build the Modbus RTU CRC16 (poly 0xA001) lookup table"""
+    table = array('H')
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc >>= 1
+                crc ^= 0xA001
+            else:
+                crc >>= 1
+        table.append(crc)
+    return table
+
+
+_CRC16_TABLE = _build_crc16_table()
+
+# Optional Cython extension, built with: python setup.py build_ext --inplace
+try:
+    from ._crc16 import crc16_modbus as _crc16_ext
+except ImportError:
+    _crc16_ext = None
+
+# Optional shared library loaded through ctypes, built from crc16_modbus.c
+def _load_crc16_lib():
+    """Load crc16_modbus() from libmodbuscrc.so next to this module"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libmodbuscrc.so')
+    try:
+        func = ctypes.CDLL(path).crc16_modbus
+    except (OSError, AttributeError):
+        # Missing library, or a stale build without the symbol
+        return None
+    func.restype = ctypes.c_uint16
+    func.argtypes = [ctypes.c_char_p, ctypes.c_size_t]
+    return func
+
+
+_crc16_lib = _load_crc16_lib()
+
+# Optional C implementations of the Modbus CRC, used when installed
+try:
+    from fastcrc import crc16 as _fastcrc16
+    _crc16_c = _fastcrc16.modbus
+except ImportError:
+    try:
+        import crcmod.predefined
+        _crc16_c = crcmod.predefined.mkPredefinedCrcFun('modbus')
+    except ImportError:
+        _crc16_c = None
+
+# Compiled fixed frame layouts
+_CMD_STRUCT = struct.Struct('>BBHH')         # slave, function, address, count/value
+_WR_HEADER_STRUCT = struct.Struct('>BBHHB')  # FC16 header: slave, function, address, count, bytes
+_U16_LE = struct.Struct('<H')
+
+# Compiled big-endian register layouts, keyed by register count
+_REGISTER_STRUCTS: Dict[int, struct.Struct] = {}
+
+
+def _register_struct(num_registers: int) -> struct.Struct:
+    """Get a cached Struct for packing/unpacking num_registers big-endian registers"""
+    register_struct = _REGISTER_STRUCTS.get(num_registers)
+    if register_struct is None:
+        register_struct = _REGISTER_STRUCTS[num_registers] = struct.Struct(f'>{num_registers}H')
+    return register_struct
+
+# Largest register count allowed in a single FC03/FC04 request
+MAX_READ_REGISTERS = 125
+RX_BUFFER_SIZE = 5 + 2 * MAX_READ_REGISTERS
+
+class ModbusFraming:
+    """Modbus RTU frame building and reply checking, independent of how frames are sent
     
-    def __enter__(self):
-        """Context manager entry"""
-        if self.connect():
-            return self
-        raise ConnectionError(f"Failed to connect to {self.port}")
+    Shared by the blocking and asyncio clients.
+    """
     
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit"""
-        self.disconnect()
+    def __init__(self, slave_id: int):
+        self.slave_id = slave_id
+        # Exception code of the last rejected write, None if it wasn't rejected
+        self.last_error_code: Optional[int] = None
+        self._cmd_cache: Dict[Tuple[int, int, int, int], bytes] = {}
     
     def calculate_crc16(self, data: bytes) -> bytes:
         """Calculate Modbus RTU CRC16"""
+        if _crc16_ext is not None:
+            return _crc16_ext(data)
+        if _crc16_lib is not None:
+            data = bytes(data)
+            return _U16_LE.pack(_crc16_lib(data, len(data)))
+        if _crc16_c is not None:
+            return _U16_LE.pack(_crc16_c(bytes(data)))
+        
         crc = 0xFFFF
+        table = _CRC16_TABLE
         for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                if crc & 0x0001:
-                    crc >>= 1
-                    crc ^= 0xA001
-                else:
-                    crc >>= 1
-        return struct.pack('<H', crc)
+            crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+        return _U16_LE.pack(crc)
     
     def create_modbus_command(self, function_code: int, start_addr: int, num_registers: int) -> bytes:
-        """Create a Modbus RTU command with CRC"""
-        data = struct.pack('>BBHH', self.slave_id, function_code, start_addr, num_registers)
-        crc = self.calculate_crc16(data)
-        return data + crc
+        """Create a Modbus RTU command with CRC, reusing frames already built"""
+        key = (self.slave_id, function_code, start_addr, num_registers)
+        command = self._cmd_cache.get(key)
+        if command is None:
+            data = _CMD_STRUCT.pack(*key)
+            command = self._cmd_cache[key] = data + self.calculate_crc16(data)
+        return command
     
-    def parse_modbus_response(self, response: bytes) -> Optional[Dict]:
-        """Parse Modbus RTU response"""
+    def parse_modbus_response(self, response: Union[bytes, memoryview]) -> Optional[Dict]:
+        """Parse Modbus RTU response from bytes or a memoryview without copying the payload"""
         if len(response) < 5:
             return None
         
@@ -80,6 +133,10 @@ class ModbusRTUClient:
         
         # Check for error response
         if function_code & 0x80:
+            # A corrupt frame must not pass for a real exception code
+            if (len(response) != 5 or slave_id != self.slave_id
+                    or self.calculate_crc16(response[:3]) != response[3:5]):
+                return None
             error_code = response[2]
             return {
                 'slave_id': slave_id,
@@ -92,24 +149,70 @@ class ModbusRTUClient:
         # Parse successful response
         if function_code in [0x03, 0x04]:  # Read holding/input registers
             byte_count = response[2]
-            data = response[3:3+byte_count]
             
-            # Parse 16-bit registers
-            registers = []
-            for i in range(0, len(data), 2):
-                if i + 1 < len(data):
-                    reg_value = struct.unpack('>H', data[i:i+2])[0]
-                    registers.append(reg_value)
+            # A short or overlong frame is malformed, not a partial block
+            if len(response) != byte_count + 5:
+                return None
+            
+            # Parse all 16-bit registers with a single unpack
+            registers = list(_register_struct(byte_count >> 1).unpack_from(response, 3))
             
             return {
                 'slave_id': slave_id,
                 'function_code': function_code,
                 'error': False,
                 'byte_count': byte_count,
-                'registers': registers
+                'registers': registers,
+                'crc_ok': self.calculate_crc16(response[:byte_count + 3]) == response[byte_count + 3:]
             }
         
-        return {'raw': response}
+        if function_code in [0x06, 0x10] and len(response) >= 8:  # Write single/multiple registers
+            # FC06 echoes the written value, FC16 the number of registers written
+            _, _, address, value = _CMD_STRUCT.unpack_from(response)
+            return {
+                'slave_id': slave_id,
+                'function_code': function_code,
+                'error': False,
+                'address': address,
+                'value': value,
+                'crc_ok': self.calculate_crc16(response[:6]) == response[6:8]
+            }
+        
+        return {'raw': bytes(response)}
+    
+    def _check_read_reply(self, parsed: Optional[Dict], function_code: int, start_addr: int,
+                          num_registers: int) -> Optional[List[int]]:
+        """Return the registers of a read reply, or None unless it is the complete, intact answer"""
+        if not parsed:
+            _log.warning("Malformed reply to read at 0x%04X", start_addr)
+            return None
+        if parsed.get('error'):
+            _log.warning("Modbus Error: %s", parsed['error_message'])
+            return None
+        if (parsed.get('slave_id') != self.slave_id or parsed.get('function_code') != function_code
+                or not parsed.get('crc_ok') or parsed.get('byte_count') != num_registers * 2):
+            _log.warning("Unexpected reply to read at 0x%04X", start_addr)
+            return None
+        return parsed['registers']
+    
+    def _check_write_reply(self, parsed: Optional[Dict], function_code: int, address: int, value: int) -> bool:
+        """Check a write reply echoes the request, recording the exception code if rejected
+        
+        value is the written value for FC06 and the register count for FC16.
+        """
+        self.last_error_code = None
+        if not parsed:
+            return False
+        if parsed.get('error'):
+            self.last_error_code = parsed['error_code']
+            _log.warning("Modbus Write Error: %s", parsed['error_message'])
+            return False
+        if (parsed.get('slave_id') != self.slave_id or parsed.get('function_code') != function_code
+                or not parsed.get('crc_ok') or parsed.get('address') != address
+                or parsed.get('value') != value):
+            _log.warning("Unexpected reply to write at 0x%04X", address)
+            return False
+        return True
     
     def get_error_message(self, error_code: int) -> str:
         """Get human-readable error message"""
@@ -123,6 +226,50 @@ class ModbusRTUClient:
             8: "Memory Parity Error"
         }
         return error_messages.get(error_code, f"Unknown Error ({error_code})")
+
+class ModbusRTUClient(ModbusFraming):
+    """Modbus RTU client for solar charger communication"""
+    
+    def __init__(self, port: str, baudrate: int = 115200, slave_id: int = 1, timeout: float = 1.0):
+        super().__init__(slave_id)
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.serial_conn = None
+        # Responses are read into one reusable buffer and parsed in place
+        self._rx_buf = bytearray(RX_BUFFER_SIZE)
+        self._rx_view = memoryview(self._rx_buf)
+        
+    def connect(self) -> bool:
+        """Establish serial connection"""
+        try:
+            self.serial_conn = serial.Serial(
+                port=self.port,
+                baudrate=self.baudrate,
+                timeout=self.timeout,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                bytesize=serial.EIGHTBITS
+            )
+            return True
+        except Exception as e:
+            _log.error("Failed to connect to %s: %s", self.port, e)
+            return False
+    
+    def disconnect(self):
+        """Close serial connection"""
+        if self.serial_conn and self.serial_conn.is_open:
+            self.serial_conn.close()
+    
+    def __enter__(self):
+        """Context manager entry"""
+        if self.connect():
+            return self
+        raise ConnectionError(f"Failed to connect to {self.port}")
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.disconnect()
     
     def read_registers(self, function_code: int, start_addr: int, num_registers: int = 1) -> Optional[List[int]]:
         """Read registers from device"""
@@ -134,29 +281,47 @@ class ModbusRTUClient:
             cmd = self.create_modbus_command(function_code, start_addr, num_registers)
             
             self.serial_conn.reset_input_buffer()
+            self.serial_conn.timeout = self.timeout
             self.serial_conn.write(cmd)
-            time.sleep(0.05)  # Brief delay for response
             
-            # Read response
-            response = self.serial_conn.read(self.serial_conn.in_waiting or (5 + num_registers * 2))
+            # Read response: blocks until the full frame arrives or the timeout elapses
+            response = self._read_response(5 + num_registers * 2)
             
             if not response:
                 return None
             
-            # Parse response
-            parsed = self.parse_modbus_response(response)
-            
-            if parsed and not parsed.get('error'):
-                return parsed.get('registers', [])
-            elif parsed and parsed.get('error'):
-                print(f"Modbus Error: {parsed.get('error_message', 'Unknown error')}")
-                return None
+            # Only a complete frame from this slave with a valid CRC is trusted
+            return self._check_read_reply(self.parse_modbus_response(response),
+                                          function_code, start_addr, num_registers)
             
         except Exception as e:
-            print(f"Error reading registers 0x{start_addr:04X}: {e}")
+            _log.warning("Error reading registers 0x%04X: %s", start_addr, e)
             return None
+    
+    def _read_response(self, expected_len: int) -> memoryview:
+        """Read one complete response frame into the receive buffer
         
-        return None
+        The slave ID, function code and next byte are read first to decide
+        how long the rest of the frame is: exception responses are 5 bytes,
+        FC03/FC04 responses carry their own byte count, and anything else is
+        expected_len bytes. The returned view is only valid until the next read.
+        """
+        view = self._rx_view
+        received = self.serial_conn.readinto(view[:3]) or 0
+        if received < 3:
+            return view[:received]
+        
+        function_code = view[1]
+        if function_code & 0x80:
+            frame_len = 5
+        elif function_code in (0x03, 0x04):
+            frame_len = view[2] + 5
+        else:
+            frame_len = expected_len
+        frame_len = min(frame_len, RX_BUFFER_SIZE)
+        
+        received += self.serial_conn.readinto(view[3:frame_len]) or 0
+        return view[:received]
     
     def read_input_registers(self, start_addr: int, num_registers: int = 1) -> Optional[List[int]]:
         """Read input registers (Function Code 04)"""
@@ -187,6 +352,35 @@ class ModbusRTUClient:
         
         return None
     
+    def read_registers_coalesced(self, addresses: List[int], is_holding: bool = False,
+                                 gap_threshold: int = 4) -> Dict[int, int]:
+        """Read scattered registers using as few block reads as possible
+        
+        Addresses no more than gap_threshold apart are read in one request
+        (up to MAX_READ_REGISTERS registers). Only the requested addresses
+        are returned; addresses whose block could not be read are omitted.
+        """
+        wanted = sorted(set(addresses))
+        results = {}
+        
+        i = 0
+        while i < len(wanted):
+            run_start = run_end = wanted[i]
+            j = i + 1
+            while (j < len(wanted) and wanted[j] - run_end <= gap_threshold
+                   and wanted[j] - run_start < MAX_READ_REGISTERS):
+                run_end = wanted[j]
+                j += 1
+            
+            block = self.read_register_block(run_start, run_end - run_start + 1, is_holding)
+            if block:
+                for addr in wanted[i:j]:
+                    if addr in block:
+                        results[addr] = block[addr]
+            i = j
+        
+        return results
+    
     def write_single_register(self, address: int, value: int) -> bool:
         """Write a single holding register (Function Code 06)"""
         if not self.serial_conn or not self.serial_conn.is_open:
@@ -194,34 +388,24 @@ class ModbusRTUClient:
         
         try:
             # Create write single register command (Function Code 06)
-            data = struct.pack('>BBHH', self.slave_id, 0x06, address, value)
+            data = _CMD_STRUCT.pack(self.slave_id, 0x06, address, value)
             crc = self.calculate_crc16(data)
             cmd = data + crc
             
             self.serial_conn.reset_input_buffer()
+            self.serial_conn.timeout = self.timeout
             self.serial_conn.write(cmd)
-            time.sleep(0.1)  # Wait for response
-            
-            # Read response
-            response = self.serial_conn.read(self.serial_conn.in_waiting or 8)
-            
-            if not response:
-                return False
             
-            # Parse response
-            parsed = self.parse_modbus_response(response)
+            # Read response (FC06 echoes the 8-byte request)
+            response = self._read_response(8)
             
-            if parsed and not parsed.get('error'):
-                return True
-            elif parsed and parsed.get('error'):
-                print(f"Modbus Write Error: {parsed.get('error_message', 'Unknown error')}")
-                return False
+            # A matching echo confirms the value was written
+            return self._check_write_reply(self.parse_modbus_response(response), 0x06, address, value)
             
         except Exception as e:
-            print(f"Error writing register 0x{address:04X}: {e}")
+            self.last_error_code = None
+            _log.warning("Error writing register 0x%04X: %s", address, e)
             return False
-        
-        return False
     
     def write_multiple_registers(self, start_addr: int, values: List[int]) -> bool:
         """Write multiple holding registers (Function Code 16)"""
@@ -233,12 +417,10 @@ class ModbusRTUClient:
             byte_count = num_registers * 2
             
             # Create write multiple registers command (Function Code 16)
-            header = struct.pack('>BBHHB', self.slave_id, 0x10, start_addr, num_registers, byte_count)
+            header = _WR_HEADER_STRUCT.pack(self.slave_id, 0x10, start_addr, num_registers, byte_count)
             
             # Pack register values
-            data_bytes = b''
-            for value in values:
-                data_bytes += struct.pack('>H', value)
+            data_bytes = _register_struct(num_registers).pack(*values)
             
             # Complete command with CRC
             data = header + data_bytes
@@ -246,35 +428,35 @@ class ModbusRTUClient:
             cmd = data + crc
             
             self.serial_conn.reset_input_buffer()
+            self.serial_conn.timeout = self.timeout
             self.serial_conn.write(cmd)
-            time.sleep(0.1)
-            
-            # Read response
-            response = self.serial_conn.read(self.serial_conn.in_waiting or 8)
-            
-            if not response:
-                return False
             
-            # Parse response
-            parsed = self.parse_modbus_response(response)
+            # Read response (FC16 replies with the start address and register count)
+            response = self._read_response(8)
             
-            if parsed and not parsed.get('error'):
-                return True
-            elif parsed and parsed.get('error'):
-                print(f"Modbus Write Error: {parsed.get('error_message', 'Unknown error')}")
-                return False
+            return self._check_write_reply(self.parse_modbus_response(response), 0x10, start_addr, num_registers)
             
         except Exception as e:
-            print(f"Error writing registers starting at 0x{start_addr:04X}: {e}")
+            self.last_error_code = None
+            _log.warning("Error writing registers starting at 0x%04X: %s", start_addr, e)
             return False
-        
-        return False
     
     def test_connection(self) -> bool:
         """Test connection by reading a known register"""
+        if not self.serial_conn or not self.serial_conn.is_open:
+            return False
+        
         try:
-            # Try to read battery voltage (known working register)
-            result = self.read_input_registers(0x3104, 1)
-            return result is not None
-        except:
+            # Read battery voltage (known working register) in one 7-byte exchange
+            cmd = self.create_modbus_command(0x04, 0x3104, 1)
+            
+            self.serial_conn.reset_input_buffer()
+            self.serial_conn.timeout = self.timeout
+            self.serial_conn.write(cmd)
+            response = self._read_response(7)
+        except (serial.SerialException, OSError) as e:
+            _log.warning("Connection test failed: %s", e)
             return False
+        
+        return (len(response) == 7 and response[0] == self.slave_id and response[1] == 0x04
+                and self.calculate_crc16(response[:5]) == response[5:7])
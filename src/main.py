@@ -5,21 +5,54 @@ Command-line interface for Tracer3210AN Solar Charge Controller
 """
 
 import argparse
+import logging
+import os
+import random
 import sys
 import time
-import json
-from typing import Optional, Dict, List
+from collections import defaultdict
+from contextlib import contextmanager
+from operator import attrgetter, itemgetter
+from typing import Callable, Optional, Dict, List, Tuple
 from datetime import datetime
 
 from communication.modbus_client import ModbusRTUClient
-from models.device_data import DeviceDataManager, DeviceSnapshot
+from models.device_data import DeviceDataManager, DeviceSnapshot, ParamListEntry, hex_address
 
-# Add writable parameters support
-sys.path.append('..')
-from writable_parameters import (
-    get_writable_parameter, get_writable_parameters_by_category, 
-    get_writable_categories, validate_voltage_sequence, BATTERY_TYPE_SETTINGS
-)
+# Writable parameters support lives in the project root and is imported by
+# the commands that use it
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+
+# Registers no more than this far apart are fetched in a single block read
+READ_GAP_THRESHOLD = 4
+
+# Write verification polls the register until it reads back the written value
+VERIFY_RETRIES = 10
+VERIFY_INTERVAL = 0.05
+
+# Failed register writes are retried with exponential backoff plus random jitter
+WRITE_RETRIES = 3
+WRITE_BACKOFF_BASE = 0.05
+WRITE_BACKOFF_MAX = 0.5
+WRITE_BACKOFF_JITTER = 0.025
+
+# Modbus exception codes that retrying a write cannot fix:
+# illegal function, illegal data address, illegal data value
+WRITE_PERMANENT_ERRORS = frozenset((1, 2, 3))
+
+# Configuration blocks read within this many seconds are reused rather than re-read
+HOLDING_CACHE_TTL = 30.0
+
+# JSON delta monitoring emits a full snapshot every this many samples
+MONITOR_FULL_SNAPSHOT_EVERY = 10
+
+# Buffer size for output, backup and restore files
+OUTPUT_FILE_BUFFER = 65536
+
+# Progress and diagnostic messages go to stderr so stdout carries only data
+_log = logging.getLogger('solar_charger')
 
 class SolarChargerCLI:
     """Main CLI application class"""
@@ -27,6 +60,33 @@ class SolarChargerCLI:
     def __init__(self):
         self.data_manager = DeviceDataManager()
         self.client = None
+        self._param_tables: Dict[Optional[str], Tuple[List[ParamListEntry], Dict[str, ParamListEntry], Dict[int, ParamListEntry]]] = {}
+        self._writable_params: Dict[Optional[str], Dict] = {}
+        # Holding register blocks by name, with the monotonic time they were read
+        self._holding_cache: Dict[str, Tuple[float, Dict[int, int]]] = {}
+        # Set by the repl command, which keeps one connection open across commands
+        self._shared_client = False
+    
+    def get_parameter_tables(self, category: Optional[str] = None) -> Tuple[List[ParamListEntry], Dict[str, ParamListEntry], Dict[int, ParamListEntry]]:
+        """Get the parameter list with name and address lookups, built once per category"""
+        tables = self._param_tables.get(category)
+        if tables is None:
+            params = list(self.data_manager.get_parameter_list(category))
+            tables = (
+                params,
+                {p.name: p for p in params},
+                {p.address_int: p for p in params}
+            )
+            self._param_tables[category] = tables
+        return tables
+    
+    def get_writable_parameters(self, category: Optional[str] = None) -> Dict:
+        """Get writable parameter definitions by name, loaded once per category"""
+        params = self._writable_params.get(category)
+        if params is None:
+            from writable_parameters import get_writable_parameters_by_category
+            params = self._writable_params[category] = get_writable_parameters_by_category(category)
+        return params
     
     def create_argument_parser(self) -> argparse.ArgumentParser:
         """Create command line argument parser"""
@@ -63,15 +123,19 @@ Examples:
                           default='human', help='Output format (default: human)')
         parser.add_argument('--output', '-o', type=str,
                           help='Output file (default: stdout)')
+        parser.add_argument('--verbose', '-v', action='store_true',
+                          help='Show progress messages on stderr')
         
         # Commands
         subparsers = parser.add_subparsers(dest='command', help='Available commands')
         
         # Discover command
         discover_parser = subparsers.add_parser('discover', help='Discover and test device connection')
+        discover_parser.set_defaults(func=self.cmd_discover, needs_device=True)
         
         # Read all command
         read_all_parser = subparsers.add_parser('read-all', help='Read all available parameters')
+        read_all_parser.set_defaults(func=self.cmd_read_all, needs_device=True)
         read_all_parser.add_argument('--category', '-c', 
                                    help='Filter by category (pv, battery, load, system, statistics, config)')
         read_all_parser.add_argument('--efficient', action='store_true',
@@ -79,20 +143,25 @@ Examples:
         
         # Read specific parameters
         read_parser = subparsers.add_parser('read', help='Read specific parameters')
+        read_parser.set_defaults(func=self.cmd_read, needs_device=True)
         read_parser.add_argument('parameters', nargs='+',
                                help='Parameter names or addresses to read')
         
         # Monitor command
         monitor_parser = subparsers.add_parser('monitor', help='Continuous monitoring mode')
+        monitor_parser.set_defaults(func=self.cmd_monitor, needs_device=True)
         monitor_parser.add_argument('--interval', '-i', type=float, default=5.0,
                                   help='Update interval in seconds (default: 5.0)')
         monitor_parser.add_argument('--count', '-n', type=int,
                                   help='Number of readings (default: infinite)')
         monitor_parser.add_argument('--category', '-c',
                                   help='Monitor specific category only')
+        monitor_parser.add_argument('--delta', action=argparse.BooleanOptionalAction, default=None,
+                                  help='JSON only: emit only changed values between full snapshots (default: on)')
         
         # List parameters command
         list_parser = subparsers.add_parser('list-parameters', help='List available parameters')
+        list_parser.set_defaults(func=self.cmd_list_parameters, needs_device=False)
         list_parser.add_argument('--category', '-c',
                                help='Filter by category')
         list_parser.add_argument('--detailed', action='store_true',
@@ -100,20 +169,25 @@ Examples:
         
         # Export command
         export_parser = subparsers.add_parser('export', help='Export current data')
+        export_parser.set_defaults(func=self.cmd_export, needs_device=True)
         export_parser.add_argument('--include-config', action='store_true',
                                  help='Include configuration parameters')
         
         # Write single parameter command
         write_parser = subparsers.add_parser('write', help='Write configuration parameter')
+        write_parser.set_defaults(func=self.cmd_write, needs_device=True)
         write_parser.add_argument('parameter', help='Parameter name to write')
         write_parser.add_argument('value', help='Value to write')
         write_parser.add_argument('--force', action='store_true',
                                 help='Skip confirmation prompts')
         write_parser.add_argument('--dry-run', action='store_true',
                                 help='Validate without writing')
+        write_parser.add_argument('--no-verify', action='store_true',
+                                help="Trust the device's write echo instead of reading the value back")
         
         # Write multiple parameters command
         write_config_parser = subparsers.add_parser('write-config', help='Write multiple configuration parameters')
+        write_config_parser.set_defaults(func=self.cmd_write_config, needs_device=True)
         write_config_parser.add_argument('--battery-type', help='Set battery type and apply recommended settings')
         write_config_parser.add_argument('--battery-capacity', type=float, help='Battery capacity in Ah')
         write_config_parser.add_argument('--config-file', help='JSON file with configuration parameters')
@@ -121,34 +195,49 @@ Examples:
                                        help='Skip confirmation prompts')
         write_config_parser.add_argument('--dry-run', action='store_true',
                                        help='Validate without writing')
+        write_config_parser.add_argument('--no-verify', action='store_true',
+                                       help="Trust the device's write echo instead of reading values back")
         
         # List writable parameters command
         list_writable_parser = subparsers.add_parser('list-writable', help='List writable parameters')
+        list_writable_parser.set_defaults(func=self.cmd_list_writable, needs_device=False)
         list_writable_parser.add_argument('--category', '-c', help='Filter by category')
         list_writable_parser.add_argument('--detailed', action='store_true',
                                         help='Show detailed parameter information including ranges')
         
         # Backup/restore commands
         backup_parser = subparsers.add_parser('backup-config', help='Backup current configuration')
+        backup_parser.set_defaults(func=self.cmd_backup_config, needs_device=True)
         backup_parser.add_argument('--output', '-o', help='Backup file name')
         
         restore_parser = subparsers.add_parser('restore-config', help='Restore configuration from backup')
+        restore_parser.set_defaults(func=self.cmd_restore_config, needs_device=True)
         restore_parser.add_argument('backup_file', help='Backup file to restore')
         restore_parser.add_argument('--force', action='store_true',
                                   help='Skip confirmation prompts')
+        restore_parser.add_argument('--no-verify', action='store_true',
+                                  help="Trust the device's write echo instead of reading values back")
+        
+        # Scripting mode: many commands over one connection
+        repl_parser = subparsers.add_parser('repl', help='Run commands read from stdin over one connection')
+        repl_parser.set_defaults(func=self.cmd_repl, needs_device=True)
         
         return parser
     
     def connect_device(self, device: str, speed: int, slave_id: int, timeout: float) -> bool:
         """Connect to the solar charger device"""
+        if self._shared_client:
+            return True
+        
         try:
             self.client = ModbusRTUClient(device, speed, slave_id, timeout)
             if self.client.connect():
                 if self.client.test_connection():
-                    print(f"✓ Connected to solar charger on {device}")
+                    _log.info("✓ Connected to solar charger on %s", device)
                     return True
                 else:
                     print(f"✗ Device connected but not responding properly")
+                    self.client.disconnect()
                     return False
             else:
                 print(f"✗ Failed to connect to {device}")
@@ -157,6 +246,15 @@ Examples:
             print(f"✗ Connection error: {e}")
             return False
     
+    @contextmanager
+    def _device_session(self):
+        """Use the connected client for one command, closing it afterwards unless shared"""
+        try:
+            yield self.client
+        finally:
+            if not self._shared_client:
+                self.client.disconnect()
+    
     def cmd_discover(self, args) -> int:
         """Discover and test device connection"""
         print("Solar Charger Discovery")
@@ -166,7 +264,7 @@ Examples:
             return 1
         
         try:
-            with self.client:
+            with self._device_session():
                 # Test basic communication
                 print(f"Device: {args.device}")
                 print(f"Speed: {args.speed} baud")
@@ -203,15 +301,14 @@ Examples:
             return 1
         
         try:
-            with self.client:
+            with self._device_session():
                 if args.efficient:
                     snapshot = self._read_all_efficient(args.category)
                 else:
                     snapshot = self._read_all_individual(args.category)
                 
                 if snapshot:
-                    output = self.data_manager.format_for_output(snapshot, args.format)
-                    self._write_output(output, args.output)
+                    self._write_snapshot(snapshot, args.format, args.output)
                     return 0
                 else:
                     print("✗ Failed to read device data")
@@ -223,96 +320,113 @@ Examples:
     
     def _read_all_efficient(self, category_filter: Optional[str] = None) -> Optional[DeviceSnapshot]:
         """Read all parameters using efficient multi-register reads"""
-        print("Reading device data (efficient mode)...")
+        _log.info("Reading device data (efficient mode)...")
+        verbose = _log.isEnabledFor(logging.INFO)
         
         register_data = {}
         holding_data = {}
         
-        read_blocks = self.data_manager.get_efficient_read_blocks()
+        read_blocks = self.data_manager.get_efficient_read_blocks(category_filter)
+        progress = []
         
         for block_name, block_info in read_blocks.items():
-            if category_filter:
-                # Skip blocks that don't match category filter
-                if category_filter == 'config' and block_info['function_code'] != 3:
-                    continue
-                elif category_filter != 'config' and block_info['function_code'] == 3:
-                    continue
+            is_holding = block_info['function_code'] == 3
+            cached = self._holding_cache.get(block_name) if is_holding else None
+            if cached and time.monotonic() - cached[0] < HOLDING_CACHE_TTL:
+                holding_data.update(cached[1])
+                if verbose:
+                    progress.append(f"  Cached {block_info['description']}")
+                continue
             
-            print(f"  Reading {block_info['description']}...")
-            
-            if block_info['function_code'] == 4:
-                # Input registers
-                block_data = self.client.read_register_block(
-                    block_info['start_address'], 
-                    block_info['count'], 
-                    is_holding=False
-                )
-                if block_data:
+            block_data = self._read_one_block(self.client, block_info)
+            if block_data:
+                if is_holding:
+                    self._holding_cache[block_name] = (time.monotonic(), block_data)
+                    holding_data.update(block_data)
+                else:
                     register_data.update(block_data)
+                if verbose:
+                    progress.append(f"  Read {block_info['description']}")
             else:
-                # Holding registers
-                block_data = self.client.read_register_block(
-                    block_info['start_address'], 
-                    block_info['count'], 
-                    is_holding=True
-                )
-                if block_data:
-                    holding_data.update(block_data)
+                _log.warning("  Failed to read %s", block_info['description'])
+        
+        # Report after the bus work so log writes don't stretch the read cycle
+        if progress:
+            _log.info("\n".join(progress))
         
         if register_data or holding_data:
             return self.data_manager.create_device_snapshot(register_data, holding_data)
         
         return None
     
+    @staticmethod
+    def _read_one_block(client: ModbusRTUClient, block_info: Dict) -> Optional[Dict[int, int]]:
+        """Read one register block described by get_efficient_read_blocks
+
+        Takes the client explicitly so blocks for separate devices can be
+        dispatched to a thread pool, one worker per serial port.
+        """
+        return client.read_register_block(
+            block_info['start_address'],
+            block_info['count'],
+            is_holding=block_info['function_code'] == 3
+        )
+    
     def _read_all_individual(self, category_filter: Optional[str] = None) -> Optional[DeviceSnapshot]:
-        """Read all parameters individually (slower but more comprehensive)"""
-        print("Reading device data (comprehensive mode)...")
-        
-        register_data = {}
-        holding_data = {}
+        """Read every known parameter (slower but more comprehensive)"""
+        _log.info("Reading device data (comprehensive mode)...")
         
         # Get all parameters
-        all_params = self.data_manager.get_parameter_list(category_filter)
+        all_params, _, _ = self.get_parameter_tables(category_filter)
         
+        input_addrs = []
+        holding_addrs = []
         for param in all_params:
-            addr = int(param['address'], 16)
-            is_holding = param['function_code'] == 3
-            
-            value = self.client.read_single_register(addr, is_holding)
-            if value is not None:
-                if is_holding:
-                    holding_data[addr] = value
-                else:
-                    register_data[addr] = value
+            if param.is_holding:
+                holding_addrs.append(param.address_int)
+            else:
+                input_addrs.append(param.address_int)
+        
+        register_data = self._read_addresses(input_addrs, is_holding=False)
+        holding_data = self._read_addresses(holding_addrs, is_holding=True)
         
         if register_data or holding_data:
             return self.data_manager.create_device_snapshot(register_data, holding_data)
         
         return None
     
+    def _read_addresses(self, addresses: List[int], is_holding: bool,
+                        gap_threshold: int = READ_GAP_THRESHOLD) -> Dict[int, int]:
+        """Read registers in coalesced blocks, retrying singly any the blocks missed"""
+        values = self.client.read_registers_coalesced(addresses, is_holding, gap_threshold)
+        
+        # A block containing an address the device rejects fails as a whole
+        for addr in addresses:
+            if addr not in values:
+                value = self.client.read_single_register(addr, is_holding)
+                if value is not None:
+                    values[addr] = value
+        
+        return values
+    
     def cmd_read(self, args) -> int:
         """Read specific parameters"""
         if not self.connect_device(args.device, args.speed, args.slave_id, args.timeout):
             return 1
         
         try:
-            with self.client:
-                register_data = {}
-                holding_data = {}
-                
+            with self._device_session():
                 # Get all available parameters for lookup
-                all_params = self.data_manager.get_parameter_list()
-                param_lookup = {p['name']: p for p in all_params}
-                addr_lookup = {p['address']: p for p in all_params}
+                _, param_lookup, addr_lookup = self.get_parameter_tables()
                 
+                requested = []
                 for param_spec in args.parameters:
                     # Try to parse as address first
                     if param_spec.startswith('0x') or param_spec.startswith('0X'):
                         try:
                             addr = int(param_spec, 16)
-                            if param_spec.upper() in addr_lookup:
-                                param_info = addr_lookup[param_spec.upper()]
-                                is_holding = param_info['function_code'] == 3
+                            if addr in addr_lookup:
+                                is_holding = addr_lookup[addr].is_holding
                             else:
                                 # Unknown address, try both function codes
                                 is_holding = addr >= 0x9000  # Heuristic
@@ -323,27 +437,30 @@ Examples:
                         # Look up by parameter name
                         if param_spec in param_lookup:
                             param_info = param_lookup[param_spec]
-                            addr = int(param_info['address'], 16)
-                            is_holding = param_info['function_code'] == 3
+                            addr = param_info.address_int
+                            is_holding = param_info.is_holding
                         else:
                             print(f"✗ Unknown parameter: {param_spec}")
                             continue
                     
-                    # Read the parameter
-                    value = self.client.read_single_register(addr, is_holding)
+                    requested.append((param_spec, addr, is_holding))
+                
+                # Read the parameters, merging nearby addresses into block reads
+                register_data = self._read_addresses(
+                    [addr for _, addr, is_holding in requested if not is_holding], is_holding=False)
+                holding_data = self._read_addresses(
+                    [addr for _, addr, is_holding in requested if is_holding], is_holding=True)
+                
+                for param_spec, addr, is_holding in requested:
+                    value = (holding_data if is_holding else register_data).get(addr)
                     if value is not None:
-                        if is_holding:
-                            holding_data[addr] = value
-                        else:
-                            register_data[addr] = value
-                        print(f"✓ Read {param_spec}: {value}")
+                        _log.info("✓ Read %s: %s", param_spec, value)
                     else:
-                        print(f"✗ Failed to read {param_spec}")
+                        _log.warning("✗ Failed to read %s", param_spec)
                 
                 if register_data or holding_data:
                     snapshot = self.data_manager.create_device_snapshot(register_data, holding_data)
-                    output = self.data_manager.format_for_output(snapshot, args.format)
-                    self._write_output(output, args.output)
+                    self._write_snapshot(snapshot, args.format, args.output)
                     return 0
                 else:
                     print("✗ No parameters successfully read")
@@ -359,76 +476,118 @@ Examples:
             return 1
         
         try:
-            with self.client:
+            with self._device_session():
                 print(f"Starting monitoring mode (interval: {args.interval}s)")
                 print("Press Ctrl+C to stop")
                 print("=" * 60)
                 
+                use_delta = args.format == 'json' and args.delta is not False
+                last_values: Dict[str, object] = {}
+                
                 count = 0
+                # Samples are scheduled on fixed deadlines so read time does not add to the period
+                deadline = time.monotonic()
                 while True:
-                    try:
-                        snapshot = self._read_all_efficient(args.category)
-                        if snapshot:
-                            if args.format == 'human':
-                                # Clear screen and show current data
-                                print("\033[2J\033[H")  # Clear screen
-                                print(self.data_manager.format_for_output(snapshot, 'human'))
-                            else:
-                                output = self.data_manager.format_for_output(snapshot, args.format)
-                                print(output)
-                                print("-" * 40)
-                        
-                        count += 1
-                        if args.count and count >= args.count:
-                            break
-                        
-                        time.sleep(args.interval)
+                    snapshot = self._read_all_efficient(args.category)
+                    if snapshot:
+                        if use_delta:
+                            output = self._format_monitor_delta(snapshot, last_values, count)
+                        else:
+                            output = self.data_manager.format_for_output(snapshot, args.format)
                         
+                        if args.format == 'human':
+                            # Clear screen and show current data in one write
+                            sys.stdout.write(f"\033[2J\033[H\n{output}\n")
+                        else:
+                            sys.stdout.write(f"{output}\n{'-' * 40}\n")
+                        sys.stdout.flush()
+                    
+                    count += 1
+                    if args.count and count >= args.count:
+                        break
+                    
+                    deadline += args.interval
+                    now = time.monotonic()
+                    if deadline < now:
+                        # Fell behind (slow reads or a stalled port): skip missed samples
+                        deadline = now
+                    
+                    try:
+                        time.sleep(deadline - now)
                     except KeyboardInterrupt:
                         print("\nMonitoring stopped by user")
                         break
                 
                 return 0
                 
+        except KeyboardInterrupt:
+            # Interrupted mid-read; the client context has already closed the port
+            print("\nMonitoring stopped by user")
+            return 0
         except Exception as e:
             print(f"✗ Monitoring failed: {e}")
             return 1
     
+    def _format_monitor_delta(self, snapshot: DeviceSnapshot, last_values: Dict[str, object], count: int) -> str:
+        """Format a JSON monitor sample as a full snapshot or only the values that changed
+        
+        last_values is updated in place with the values of this sample.
+        """
+        import json
+        
+        values = {p.name: p.formatted_value for p in snapshot.parameters}
+        if count % MONITOR_FULL_SNAPSHOT_EVERY == 0:
+            output = self.data_manager.format_for_output(snapshot, 'json')
+        else:
+            changed = {name: value for name, value in values.items()
+                       if name not in last_values or last_values[name] != value}
+            # Parameters whose read failed this time, so stale values aren't assumed
+            removed = [name for name in last_values if name not in values]
+            output = json.dumps({'timestamp': snapshot.timestamp.isoformat(), 'changed': changed,
+                                 'removed': removed}, ensure_ascii=False)
+        
+        last_values.clear()
+        last_values.update(values)
+        return output
+    
     def cmd_list_parameters(self, args) -> int:
         """List available parameters"""
-        params = self.data_manager.get_parameter_list(args.category)
+        params, _, _ = self.get_parameter_tables(args.category)
         
+        # Build the whole listing and write it once
+        out = []
         if args.detailed:
-            print("Available Parameters (Detailed)")
-            print("=" * 80)
+            out.append("Available Parameters (Detailed)")
+            out.append("=" * 80)
             
             current_category = None
-            for param in sorted(params, key=lambda x: x['category']):
-                if param['category'] != current_category:
-                    current_category = param['category']
-                    print(f"\n{current_category.upper()} PARAMETERS:")
-                    print("-" * 40)
-                
-                fc_str = f"FC{param['function_code']:02d}"
-                print(f"  {param['address']} ({fc_str}) {param['name']:<25} {param['description']}")
-                if param['unit']:
-                    print(f"    Unit: {param['unit']}")
+            for param in sorted(params, key=attrgetter('category')):
+                if param.category != current_category:
+                    current_category = param.category
+                    out.append(f"\n{current_category.upper()} PARAMETERS:")
+                    out.append("-" * 40)
+                
+                fc_str = f"FC{param.function_code:02d}"
+                out.append(f"  {param.address} ({fc_str}) {param.name:<25} {param.description}")
+                if param.unit:
+                    out.append(f"    Unit: {param.unit}")
         else:
-            print("Available Parameters")
-            print("=" * 50)
+            out.append("Available Parameters")
+            out.append("=" * 50)
             
             categories = {}
             for param in params:
-                if param['category'] not in categories:
-                    categories[param['category']] = []
-                categories[param['category']].append(param['name'])
+                if param.category not in categories:
+                    categories[param.category] = []
+                categories[param.category].append(param.name)
             
             for category, param_names in categories.items():
-                print(f"\n{category.upper()} ({len(param_names)} parameters):")
+                out.append(f"\n{category.upper()} ({len(param_names)} parameters):")
                 for name in sorted(param_names):
-                    print(f"  {name}")
+                    out.append(f"  {name}")
         
-        print(f"\nTotal: {len(params)} parameters")
+        out.append(f"\nTotal: {len(params)} parameters")
+        sys.stdout.write("\n".join(out) + "\n")
         return 0
     
     def cmd_export(self, args) -> int:
@@ -437,32 +596,38 @@ Examples:
             return 1
         
         try:
-            with self.client:
+            with self._device_session():
                 # Read all data
                 snapshot = self._read_all_efficient()
                 
                 if args.include_config:
                     # Also read configuration data
                     config_snapshot = self._read_all_efficient('config')
-                    if config_snapshot:
-                        snapshot.parameters.extend(config_snapshot.parameters)
+                    if snapshot and config_snapshot:
+                        # Snapshots are immutable, so merge into a new one
+                        snapshot = DeviceSnapshot(
+                            timestamp=snapshot.timestamp,
+                            device_info=snapshot.device_info,
+                            parameters=snapshot.parameters + config_snapshot.parameters
+                        )
                 
                 if snapshot:
+                    # One timestamp for both the payload and the default filename
+                    now = datetime.now()
+                    
                     # Create export data
                     export_data = {
-                        'export_timestamp': datetime.now().isoformat(),
+                        'export_timestamp': now.isoformat(),
                         'device_info': snapshot.device_info,
                         'data': snapshot.to_dict()
                     }
                     
-                    output = json.dumps(export_data, indent=2)
-                    
                     # Default filename if not specified
                     if not args.output:
-                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                        timestamp = now.strftime('%Y%m%d_%H%M%S')
                         args.output = f'solar_charger_export_{timestamp}.json'
                     
-                    self._write_output(output, args.output)
+                    self._write_json_output(export_data, args.output)
                     print(f"✓ Data exported to {args.output}")
                     return 0
                 else:
@@ -475,11 +640,13 @@ Examples:
     
     def cmd_write(self, args) -> int:
         """Write a single configuration parameter"""
+        from writable_parameters import get_writable_parameter
+        
         if not self.connect_device(args.device, args.speed, args.slave_id, args.timeout):
             return 1
         
         try:
-            with self.client:
+            with self._device_session():
                 # Get parameter definition
                 param = get_writable_parameter(args.parameter)
                 if not param:
@@ -521,14 +688,17 @@ Examples:
                 
                 # Write the new value
                 print(f"Writing new value...")
-                success = self.client.write_single_register(param.address, raw_value)
+                success = self._write_register(param.address, raw_value)
                 
                 if success:
                     print("✓ Write successful")
                     
+                    if args.no_verify:
+                        # The device echoed the written value back
+                        return 0
+                    
                     # Verify the write
-                    time.sleep(0.5)
-                    verify_raw = self.client.read_single_register(param.address, is_holding=True)
+                    verify_raw = self._verify_write(param.address, raw_value)
                     if verify_raw == raw_value:
                         verify_value = verify_raw * param.scale
                         print(f"✓ Verification successful: {verify_value} {param.unit}")
@@ -544,29 +714,165 @@ Examples:
             print(f"✗ Write operation failed: {e}")
             return 1
     
+    def _write_register(self, address: int, value: int) -> bool:
+        """Write a holding register, invalidating cached configuration on success
+        
+        A failed write is retried up to WRITE_RETRIES times, backing off
+        exponentially so a busy device isn't hammered. Writes the device
+        rejects as invalid are not retried.
+        """
+        for attempt in range(WRITE_RETRIES + 1):
+            if attempt:
+                if self.client.last_error_code in WRITE_PERMANENT_ERRORS:
+                    break
+                delay = min(WRITE_BACKOFF_MAX, WRITE_BACKOFF_BASE * 2 ** (attempt - 1))
+                time.sleep(delay + random.uniform(0, WRITE_BACKOFF_JITTER))
+                _log.info("Retrying write to 0x%04X (attempt %d)", address, attempt + 1)
+            if self.client.write_single_register(address, value):
+                self._holding_cache.clear()
+                return True
+        return False
+    
+    def _write_registers(self, start_addr: int, values: List[int]) -> bool:
+        """Write consecutive holding registers, invalidating cached configuration on success"""
+        if self.client.write_multiple_registers(start_addr, values):
+            self._holding_cache.clear()
+            return True
+        return False
+    
+    @staticmethod
+    def _group_contiguous(entries: List[Tuple]) -> List[List[Tuple]]:
+        """Split entries whose first item is a register address into runs of consecutive addresses"""
+        groups = []
+        for entry in sorted(entries, key=itemgetter(0)):
+            if groups and entry[0] == groups[-1][-1][0] + 1:
+                groups[-1].append(entry)
+            else:
+                groups.append([entry])
+        return groups
+    
+    def _write_contiguous(self, entries: List[Tuple[int, int, str, str]], indent: str,
+                          verify: bool = True) -> Tuple[List[str], List[str]]:
+        """Write and verify (address, raw_value, name, message) entries, one frame per run
+        
+        Each run of consecutive addresses is written with a single FC16 request
+        (falling back to FC06 per register if the device rejects it). Once
+        everything is written, all values are read back together unless verify
+        is False, in which case the device's write echo is trusted. Returns the
+        names written and the names that failed.
+        """
+        emit, flush = self._report_output()
+        written = []
+        failed = []
+        to_verify = []
+        for group in self._group_contiguous(entries):
+            start_addr = group[0][0]
+            values = [raw_value for _, raw_value, _, _ in group]
+            
+            if len(group) == 1:
+                results = [self._write_register(start_addr, values[0])]
+            elif self._write_registers(start_addr, values):
+                results = [True] * len(group)
+            else:
+                results = [self._write_register(address, raw_value) for address, raw_value, _, _ in group]
+            
+            for (address, raw_value, name, message), ok in zip(group, results):
+                emit(message)
+                if ok:
+                    written.append(name)
+                    to_verify.append((address, raw_value, name))
+                    emit(f"{indent}✓ Success")
+                else:
+                    failed.append(name)
+                    emit(f"{indent}✗ Failed")
+        
+        if verify and to_verify:
+            emit(f"Verifying {len(to_verify)} written value(s)...")
+            verified = self._verify_registers({address: raw_value for address, raw_value, _ in to_verify})
+            for address, raw_value, name in to_verify:
+                verify_raw = verified.get(address)
+                if verify_raw == raw_value:
+                    emit(f"{indent}✓ {name} verified")
+                else:
+                    emit(f"{indent}⚠️  {name} verification failed: expected {raw_value}, got {verify_raw}")
+        
+        flush()
+        return written, failed
+    
+    @staticmethod
+    def _report_output() -> Tuple[Callable[[str], None], Callable[[], None]]:
+        """Get (emit, flush) functions for per-parameter progress lines
+        
+        On a terminal each line is printed as soon as it is emitted; when
+        stdout is piped the lines are collected and written at once by flush.
+        """
+        if sys.stdout.isatty():
+            return print, lambda: None
+        
+        lines = []
+        
+        def flush():
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+                lines.clear()
+        
+        return lines.append, flush
+    
+    def _verify_registers(self, expected: Dict[int, int]) -> Dict[int, int]:
+        """Read back written holding registers, re-reading only those that don't match yet
+        
+        Nearby addresses are read together, with the same small gap as other
+        reads, so blocks don't span undefined registers the device may reject.
+        """
+        values = {}
+        pending = expected
+        for _ in range(VERIFY_RETRIES):
+            if not pending:
+                break
+            values.update(self._read_addresses(list(pending), is_holding=True))
+            pending = {addr: value for addr, value in pending.items() if values.get(addr) != value}
+            if pending:
+                time.sleep(VERIFY_INTERVAL)
+        return values
+    
+    def _verify_write(self, address: int, expected: int) -> Optional[int]:
+        """Read back a written holding register until it matches or retries run out"""
+        verify_raw = None
+        for _ in range(VERIFY_RETRIES):
+            verify_raw = self.client.read_single_register(address, is_holding=True)
+            if verify_raw == expected:
+                break
+            time.sleep(VERIFY_INTERVAL)
+        return verify_raw
+    
+    @staticmethod
+    def _group_by_category(params) -> Dict[str, List]:
+        """Group parameter objects by their category, keeping first-seen order"""
+        categories = defaultdict(list)
+        for param in params:
+            categories[param.category].append(param)
+        return categories
+    
     def cmd_list_writable(self, args) -> int:
         """List writable parameters"""
-        params = get_writable_parameters_by_category(args.category)
+        params = self.get_writable_parameters(args.category)
+        categories = self._group_by_category(params.values())
         
+        # Build the whole listing and write it once
+        out = []
         if args.detailed:
-            print("Writable Parameters (Detailed)")
-            print("=" * 80)
-            
-            categories = {}
-            for param in params.values():
-                if param.category not in categories:
-                    categories[param.category] = []
-                categories[param.category].append(param)
+            out.append("Writable Parameters (Detailed)")
+            out.append("=" * 80)
             
             for category, param_list in categories.items():
-                print(f"\n{category.upper().replace('_', ' ')} PARAMETERS:")
-                print("-" * 50)
-                
-                for param in sorted(param_list, key=lambda x: x.address):
-                    print(f"  {param.name}")
-                    print(f"    Address: 0x{param.address:04X}")
-                    print(f"    Description: {param.description}")
-                    print(f"    Unit: {param.unit}")
+                out.append(f"\n{category.upper().replace('_', ' ')} PARAMETERS:")
+                out.append("-" * 50)
+                
+                for param in sorted(param_list, key=attrgetter('address')):
+                    out.append(f"  {param.name}")
+                    out.append(f"    Address: {hex_address(param.address)}")
+                    out.append(f"    Description: {param.description}")
+                    out.append(f"    Unit: {param.unit}")
                     
                     if param.min_value is not None or param.max_value is not None:
                         range_str = f"Range: "
@@ -580,154 +886,138 @@ Examples:
                         else:
                             range_str += "no max"
                         range_str += f" {param.unit}"
-                        print(f"    {range_str}")
+                        out.append(f"    {range_str}")
                     
                     if param.valid_values:
-                        print(f"    Valid values: {param.valid_values}")
+                        out.append(f"    Valid values: {param.valid_values}")
                     
                     if param.warning_message:
-                        print(f"    ⚠️  WARNING: {param.warning_message}")
+                        out.append(f"    ⚠️  WARNING: {param.warning_message}")
                     
-                    print()
+                    out.append("")
         else:
-            print("Writable Parameters")
-            print("=" * 50)
+            out.append("Writable Parameters")
+            out.append("=" * 50)
             
-            categories = {}
-            for param in params.values():
-                if param.category not in categories:
-                    categories[param.category] = []
-                categories[param.category].append(param.name)
-            
-            for category, param_names in categories.items():
-                print(f"\n{category.upper().replace('_', ' ')} ({len(param_names)} parameters):")
-                for name in sorted(param_names):
-                    print(f"  {name}")
+            for category, param_list in categories.items():
+                out.append(f"\n{category.upper().replace('_', ' ')} ({len(param_list)} parameters):")
+                for name in sorted(param.name for param in param_list):
+                    out.append(f"  {name}")
         
-        print(f"\nTotal writable parameters: {len(params)}")
+        out.append(f"\nTotal writable parameters: {len(params)}")
+        sys.stdout.write("\n".join(out) + "\n")
         return 0
     
     def cmd_write_config(self, args) -> int:
         """Write multiple configuration parameters"""
-        if not self.connect_device(args.device, args.speed, args.slave_id, args.timeout):
-            return 1
+        import json
+        from writable_parameters import (
+            get_writable_parameter, validate_voltage_sequence, BATTERY_TYPE_SETTINGS
+        )
         
         try:
-            with self.client:
-                config_to_write = {}
-                
-                # Handle battery type with recommended settings
-                if args.battery_type:
-                    if args.battery_type not in BATTERY_TYPE_SETTINGS:
-                        print(f"✗ Unknown battery type: {args.battery_type}")
-                        print(f"Available types: {list(BATTERY_TYPE_SETTINGS.keys())}")
-                        return 1
-                    
-                    print(f"Setting battery type to {args.battery_type} with recommended settings:")
-                    
-                    # Add battery type
-                    config_to_write['battery_type'] = args.battery_type
-                    
-                    # Add recommended voltage settings
-                    recommended = BATTERY_TYPE_SETTINGS[args.battery_type]
-                    for setting_name, value in recommended.items():
-                        config_to_write[setting_name] = value
-                        print(f"  {setting_name}: {value}")
-                
-                # Handle battery capacity
-                if args.battery_capacity:
-                    config_to_write['battery_capacity'] = args.battery_capacity
-                
-                # Handle config file
-                if args.config_file:
-                    try:
-                        with open(args.config_file, 'r') as f:
-                            file_config = json.load(f)
-                        config_to_write.update(file_config)
-                        print(f"Loaded configuration from {args.config_file}")
-                    except Exception as e:
-                        print(f"✗ Failed to load config file: {e}")
-                        return 1
-                
-                if not config_to_write:
-                    print("✗ No configuration parameters specified")
-                    print("Use --battery-type, --battery-capacity, or --config-file")
+            config_to_write = {}
+            
+            # Handle battery type with recommended settings
+            if args.battery_type:
+                if args.battery_type not in BATTERY_TYPE_SETTINGS:
+                    print(f"✗ Unknown battery type: {args.battery_type}")
+                    print(f"Available types: {list(BATTERY_TYPE_SETTINGS.keys())}")
                     return 1
                 
-                # Validate all parameters
-                validated_params = []  # Use list instead of dict
-                validation_errors = []
+                print(f"Setting battery type to {args.battery_type} with recommended settings:")
                 
-                for param_name, value in config_to_write.items():
-                    param = get_writable_parameter(param_name)
-                    if not param:
-                        validation_errors.append(f"Parameter '{param_name}' is not writable")
-                        continue
-                    
-                    is_valid, error_msg, raw_value = param.validate_value(value)
-                    if not is_valid:
-                        validation_errors.append(f"{param_name}: {error_msg}")
-                    else:
-                        validated_params.append((param, value, raw_value))
+                # Add battery type
+                config_to_write['battery_type'] = args.battery_type
                 
-                if validation_errors:
-                    print("✗ Validation errors:")
-                    for error in validation_errors:
-                        print(f"  {error}")
+                # Add recommended voltage settings
+                recommended = BATTERY_TYPE_SETTINGS[args.battery_type]
+                for setting_name, value in recommended.items():
+                    config_to_write[setting_name] = value
+                    print(f"  {setting_name}: {value}")
+            
+            # Handle battery capacity
+            if args.battery_capacity:
+                config_to_write['battery_capacity'] = args.battery_capacity
+            
+            # Handle config file
+            if args.config_file:
+                try:
+                    with open(args.config_file, 'r') as f:
+                        file_config = json.load(f)
+                    config_to_write.update(file_config)
+                    print(f"Loaded configuration from {args.config_file}")
+                except Exception as e:
+                    print(f"✗ Failed to load config file: {e}")
                     return 1
+            
+            if not config_to_write:
+                print("✗ No configuration parameters specified")
+                print("Use --battery-type, --battery-capacity, or --config-file")
+                return 1
+            
+            # Validate all parameters
+            validated_params = []  # Use list instead of dict
+            validation_errors = []
+            
+            for param_name, value in config_to_write.items():
+                param = get_writable_parameter(param_name)
+                if not param:
+                    validation_errors.append(f"Parameter '{param_name}' is not writable")
+                    continue
                 
-                # Check voltage sequence
-                voltage_settings = {param.name: val for param, val, _ in validated_params}
-                voltage_warnings = validate_voltage_sequence(voltage_settings)
-                
-                if voltage_warnings:
-                    print("⚠️  Voltage sequence warnings:")
-                    for warning in voltage_warnings:
-                        print(f"  {warning}")
-                
-                # Show summary
-                print(f"\nConfiguration to write ({len(validated_params)} parameters):")
-                for param, value, raw_value in validated_params:
-                    print(f"  {param.description}: {value} {param.unit} (0x{param.address:04X})")
-                    if param.warning_message:
-                        print(f"    ⚠️  {param.warning_message}")
-                
-                if args.dry_run:
-                    print("✓ Dry run - validation passed, no data written")
+                is_valid, error_msg, raw_value = param.validate_value(value)
+                if not is_valid:
+                    validation_errors.append(f"{param_name}: {error_msg}")
+                else:
+                    validated_params.append((param, value, raw_value))
+            
+            if validation_errors:
+                print("✗ Validation errors:")
+                for error in validation_errors:
+                    print(f"  {error}")
+                return 1
+            
+            # Check voltage sequence
+            voltage_settings = {param.name: val for param, val, _ in validated_params}
+            voltage_warnings = validate_voltage_sequence(voltage_settings)
+            
+            if voltage_warnings:
+                print("⚠️  Voltage sequence warnings:")
+                for warning in voltage_warnings:
+                    print(f"  {warning}")
+            
+            # Show summary
+            print(f"\nConfiguration to write ({len(validated_params)} parameters):")
+            for param, value, raw_value in validated_params:
+                print(f"  {param.description}: {value} {param.unit} (0x{param.address:04X})")
+                if param.warning_message:
+                    print(f"    ⚠️  {param.warning_message}")
+            
+            if args.dry_run:
+                print("✓ Dry run - validation passed, no data written")
+                return 0
+            
+            # Confirmation
+            if not args.force:
+                print(f"\n⚠️  You are about to modify {len(validated_params)} configuration parameters.")
+                print("This will change how your solar charger operates!")
+                response = input("Proceed with writing configuration? (yes/no): ")
+                if response.lower() not in ['yes', 'y']:
+                    print("Configuration write cancelled")
                     return 0
-                
-                # Confirmation
-                if not args.force:
-                    print(f"\n⚠️  You are about to modify {len(validated_params)} configuration parameters.")
-                    print("This will change how your solar charger operates!")
-                    response = input("Proceed with writing configuration? (yes/no): ")
-                    if response.lower() not in ['yes', 'y']:
-                        print("Configuration write cancelled")
-                        return 0
-                
-                # Write parameters
-                success_count = 0
-                failed_params = []
-                
-                for param, value, raw_value in validated_params:
-                    print(f"Writing {param.name}: {value} {param.unit}...")
-                    
-                    if self.client.write_single_register(param.address, raw_value):
-                        success_count += 1
-                        print(f"  ✓ Success")
-                        
-                        # Verify the write
-                        time.sleep(0.2)
-                        verify_raw = self.client.read_single_register(param.address, is_holding=True)
-                        if verify_raw == raw_value:
-                            print(f"  ✓ Verified")
-                        else:
-                            print(f"  ⚠️  Verification failed: expected {raw_value}, got {verify_raw}")
-                    else:
-                        failed_params.append(param.name)
-                        print(f"  ✗ Failed")
-                    
-                    time.sleep(0.1)  # Brief delay between writes
+            
+            # All checks passed: only now open the serial port
+            if not self.connect_device(args.device, args.speed, args.slave_id, args.timeout):
+                return 1
+            
+            with self._device_session():
+                # Write parameters, batching consecutive registers into one frame
+                written, failed_params = self._write_contiguous([
+                    (param.address, raw_value, param.name, f"Writing {param.name}: {value} {param.unit}...")
+                    for param, value, raw_value in validated_params
+                ], indent="  ", verify=not args.no_verify)
+                success_count = len(written)
                 
                 print(f"\nWrite complete: {success_count}/{len(validated_params)} parameters written successfully")
                 
@@ -751,12 +1041,15 @@ Examples:
             return 1
         
         try:
-            with self.client:
+            with self._device_session():
                 print("Reading current configuration...")
                 
+                # One timestamp for both the payload and the default filename
+                now = datetime.now()
+                
                 # Read all writable parameters
                 config_backup = {
-                    'backup_timestamp': datetime.now().isoformat(),
+                    'backup_timestamp': now.isoformat(),
                     'device_info': {
                         'model': 'Tracer3210AN',
                         'device': args.device,
@@ -771,13 +1064,28 @@ Examples:
                     }
                 }
                 
-                writable_params = get_writable_parameters_by_category()
+                writable_params = self.get_writable_parameters()
                 read_count = 0
                 failed_count = 0
                 
+                emit, flush = self._report_output()
+                
+                # Read the declared configuration blocks, then anything outside them
+                values_by_addr = {}
+                for block_info in self.data_manager.get_efficient_read_blocks('config').values():
+                    emit(f"  Reading {block_info['description'].lower()}...")
+                    block_data = self._read_one_block(self.client, block_info)
+                    if block_data:
+                        values_by_addr.update(block_data)
+                
+                missing = [param.address for param in writable_params.values()
+                           if param.address not in values_by_addr]
+                if missing:
+                    emit(f"  Reading {len(missing)} other register(s)...")
+                    values_by_addr.update(self._read_addresses(missing, is_holding=True))
+                
                 for param in writable_params.values():
-                    print(f"  Reading {param.name}...")
-                    raw_value = self.client.read_single_register(param.address, is_holding=True)
+                    raw_value = values_by_addr.get(param.address)
                     
                     if raw_value is not None:
                         actual_value = raw_value * param.scale
@@ -792,7 +1100,7 @@ Examples:
                             display_value = actual_value
                         
                         config_backup['parameters'][param.name] = {
-                            'address': f'0x{param.address:04X}',
+                            'address': hex_address(param.address),
                             'raw_value': raw_value,
                             'actual_value': actual_value,
                             'display_value': display_value,
@@ -801,10 +1109,12 @@ Examples:
                             'category': param.category
                         }
                         read_count += 1
-                        print(f"    ✓ {display_value} {param.unit}")
+                        emit(f"    ✓ {param.name}: {display_value} {param.unit}")
                     else:
                         failed_count += 1
-                        print(f"    ✗ Failed to read")
+                        emit(f"    ✗ {param.name}: failed to read")
+                
+                flush()
                 
                 config_backup['metadata']['total_parameters'] = len(writable_params)
                 config_backup['metadata']['successful_reads'] = read_count
@@ -812,12 +1122,11 @@ Examples:
                 
                 # Generate filename if not provided
                 if not args.output:
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                    timestamp = now.strftime('%Y%m%d_%H%M%S')
                     args.output = f'solar_charger_config_backup_{timestamp}.json'
                 
                 # Save backup
-                with open(args.output, 'w') as f:
-                    json.dump(config_backup, f, indent=2)
+                self._save_json_file(config_backup, args.output)
                 
                 print(f"\n✓ Configuration backup saved: {args.output}")
                 print(f"✓ Backed up {read_count}/{len(writable_params)} parameters")
@@ -833,14 +1142,16 @@ Examples:
     
     def cmd_restore_config(self, args) -> int:
         """Restore configuration from backup"""
+        import json
+        from writable_parameters import get_writable_parameter
+        
         if not self.connect_device(args.device, args.speed, args.slave_id, args.timeout):
             return 1
         
         try:
             # Load backup file
             print(f"Loading backup file: {args.backup_file}")
-            with open(args.backup_file, 'r') as f:
-                backup_data = json.load(f)
+            backup_data = self._load_json_file(args.backup_file)
             
             print(f"✓ Backup loaded successfully")
             print(f"Backup date: {backup_data.get('backup_timestamp', 'Unknown')}")
@@ -858,14 +1169,24 @@ Examples:
             
             print(f"Found {len(parameters)} parameters to restore")
             
+            # Resolve every parameter definition once, before the device is touched
+            skipped_params = []
+            entries = []
+            for name, info in parameters.items():
+                param = get_writable_parameter(name)
+                if not param:
+                    skipped_params.append(name)
+                    continue
+                
+                display_value = info.get('display_value', info.get('actual_value'))
+                entries.append((param.address, info['raw_value'], name,
+                                f"  Restoring {name}: {display_value} {info.get('unit', '')}..."))
+            
             # Show what will be restored
             print("\nParameters to restore:")
-            categories = {}
+            categories = defaultdict(list)
             for name, info in parameters.items():
-                category = info.get('category', 'unknown')
-                if category not in categories:
-                    categories[category] = []
-                categories[category].append((name, info))
+                categories[info.get('category', 'unknown')].append((name, info))
             
             for category, param_list in categories.items():
                 print(f"\n  {category.upper().replace('_', ' ')}:")
@@ -883,41 +1204,15 @@ Examples:
                     print("Restore cancelled")
                     return 0
             
-            with self.client:
-                success_count = 0
-                failed_params = []
-                skipped_params = []
-                
+            with self._device_session():
                 print(f"\nRestoring configuration...")
                 
-                for name, info in parameters.items():
-                    param = get_writable_parameter(name)
-                    if not param:
-                        skipped_params.append(name)
-                        print(f"  ⚠️  Skipping {name} (not writable or not found)")
-                        continue
-                    
-                    raw_value = info['raw_value']
-                    display_value = info.get('display_value', info.get('actual_value'))
-                    
-                    print(f"  Restoring {name}: {display_value} {info.get('unit', '')}...")
-                    
-                    if self.client.write_single_register(param.address, raw_value):
-                        success_count += 1
-                        print(f"    ✓ Success")
-                        
-                        # Verify the write
-                        time.sleep(0.2)
-                        verify_raw = self.client.read_single_register(param.address, is_holding=True)
-                        if verify_raw == raw_value:
-                            print(f"    ✓ Verified")
-                        else:
-                            print(f"    ⚠️  Verification failed: expected {raw_value}, got {verify_raw}")
-                    else:
-                        failed_params.append(name)
-                        print(f"    ✗ Failed")
-                    
-                    time.sleep(0.1)  # Brief delay between writes
+                for name in skipped_params:
+                    print(f"  ⚠️  Skipping {name} (not writable or not found)")
+                
+                # Write parameters, batching consecutive registers into one frame
+                written, failed_params = self._write_contiguous(entries, indent="    ", verify=not args.no_verify)
+                success_count = len(written)
                 
                 # Summary
                 total_attempted = len(parameters) - len(skipped_params)
@@ -945,53 +1240,127 @@ Examples:
             print(f"✗ Restore failed: {e}")
             return 1
     
-    def _write_output(self, content: str, filename: Optional[str]):
-        """Write output to file or stdout"""
+    def cmd_repl(self, args) -> int:
+        """Run commands read from stdin, one per line, over a single connection"""
+        import shlex
+        
+        if not self.connect_device(args.device, args.speed, args.slave_id, args.timeout):
+            return 1
+        
+        parser = self.create_argument_parser()
+        status = 0
+        self._shared_client = True
+        try:
+            for line in sys.stdin:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                
+                try:
+                    cmd_args = parser.parse_args(shlex.split(line))
+                except (SystemExit, ValueError):
+                    # argparse has already reported the error
+                    status = 1
+                    continue
+                
+                if not cmd_args.command or cmd_args.command == 'repl':
+                    print(f"✗ Not a command: {line}")
+                    status = 1
+                    continue
+                
+                # A confirmation prompt would read the next command line as its answer
+                if hasattr(cmd_args, 'force') and not (cmd_args.force or getattr(cmd_args, 'dry_run', False)):
+                    options = "--force or --dry-run" if hasattr(cmd_args, 'dry_run') else "--force"
+                    print(f"✗ Use {options} with {cmd_args.command} in repl mode: {line}")
+                    status = 1
+                    continue
+                
+                # The connection options of the repl apply to every command
+                cmd_args.device = args.device
+                cmd_args.speed = args.speed
+                cmd_args.slave_id = args.slave_id
+                cmd_args.timeout = args.timeout
+                
+                if cmd_args.func(cmd_args) != 0:
+                    status = 1
+        finally:
+            self._shared_client = False
+            self.client.disconnect()
+        
+        return status
+    
+    @staticmethod
+    def _save_json_file(data, filename: str):
+        """Write data to a JSON file through one buffered write, using orjson when installed"""
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+        
+        if orjson is not None:
+            with open(filename, 'wb', buffering=OUTPUT_FILE_BUFFER) as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            import json
+            # orjson writes UTF-8, so the fallback does too
+            with open(filename, 'w', encoding='utf-8', buffering=OUTPUT_FILE_BUFFER) as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+    
+    @staticmethod
+    def _load_json_file(filename: str):
+        """Read a JSON file in one read, parsing with orjson when installed
+        
+        Invalid JSON raises json.JSONDecodeError (orjson's error subclasses it).
+        """
+        try:
+            import orjson
+        except ImportError:
+            import json
+            with open(filename, 'r', encoding='utf-8', buffering=OUTPUT_FILE_BUFFER) as f:
+                return json.load(f)
+        
+        with open(filename, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    def _write_snapshot(self, snapshot: DeviceSnapshot, output_format: str, filename: Optional[str]):
+        """Format a snapshot straight into a file or stdout"""
         if filename:
-            with open(filename, 'w') as f:
-                f.write(content)
+            with open(filename, 'w', encoding='utf-8', buffering=OUTPUT_FILE_BUFFER) as f:
+                self.data_manager.format_for_output(snapshot, output_format, file=f)
             print(f"✓ Output written to {filename}")
         else:
-            print(content)
+            self.data_manager.format_for_output(snapshot, output_format, file=sys.stdout)
+            sys.stdout.write("\n")
+    
+    def _write_json_output(self, data, filename: Optional[str]):
+        """Serialize data as JSON straight to file or stdout"""
+        import json
+        
+        if filename:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            print(f"✓ Output written to {filename}")
+        else:
+            json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+            print()
     
     def run(self, args: List[str] = None) -> int:
         """Main entry point"""
         parser = self.create_argument_parser()
         parsed_args = parser.parse_args(args)
         
+        logging.basicConfig(stream=sys.stderr, format='%(message)s',
+                            level=logging.INFO if parsed_args.verbose else logging.WARNING)
+        
         if not parsed_args.command:
             parser.print_help()
             return 1
         
-        # Commands that require device connection
-        device_commands = ['discover', 'read-all', 'read', 'monitor', 'export', 
-                          'write', 'write-config', 'backup-config', 'restore-config']
-        
-        if parsed_args.command in device_commands and not parsed_args.device:
+        if parsed_args.needs_device and not parsed_args.device:
             print(f"Error: --device is required for '{parsed_args.command}' command")
             return 1
         
-        # Dispatch to command handlers
-        command_handlers = {
-            'discover': self.cmd_discover,
-            'read-all': self.cmd_read_all,
-            'read': self.cmd_read,
-            'monitor': self.cmd_monitor,
-            'list-parameters': self.cmd_list_parameters,
-            'export': self.cmd_export,
-            'write': self.cmd_write,
-            'write-config': self.cmd_write_config,
-            'list-writable': self.cmd_list_writable,
-            'backup-config': self.cmd_backup_config,
-            'restore-config': self.cmd_restore_config
-        }
-        
-        handler = command_handlers.get(parsed_args.command)
-        if handler:
-            return handler(parsed_args)
-        else:
-            print(f"Unknown command: {parsed_args.command}")
-            return 1
+        return parsed_args.func(parsed_args)
 
 def main():
     """Main entry point for the CLI application"""
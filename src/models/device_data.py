@@ -6,21 +6,73 @@ Handles parameter definitions, formatting, and data organization
 
 import sys
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Mapping, Optional, TextIO, Tuple
+from collections import defaultdict, namedtuple
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from types import MappingProxyType
 
 # Add the project root to the path to import parameter_definitions
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 from parameter_definitions import (
     REALTIME_PARAMETERS, CONFIG_PARAMETERS, 
     format_value, get_all_parameters,
     BATTERY_STATUS_BITS, CHARGING_STATUS_BITS, DISCHARGING_STATUS_BITS
 )
 
-@dataclass
+@lru_cache(maxsize=4096)
+def _format_value_cached(address: int, raw_value: int, is_holding: bool) -> Mapping[str, Any]:
+    """Memoized format_value, since most registers rarely change between polls
+    
+    The result is shared between calls, so it is returned read-only.
+    """
+    return MappingProxyType(format_value(address, raw_value, is_holding))
+
+@lru_cache(maxsize=None)
+def hex_address(address: int) -> str:
+    """Register address as a 0xNNNN string, formatted once per address"""
+    return f'0x{address:04X}'
+
+@lru_cache(maxsize=1024, typed=True)
+def _render_row(description: str, formatted_value: Any, unit: str) -> str:
+    """Render one human-readable parameter line
+    
+    Memoized, since monitor mode redraws mostly unchanged values; typed so
+    that 1 and 1.0 are rendered separately.
+    """
+    # Format the value with consistent decimal places for floats
+    if isinstance(formatted_value, float):
+        value_str = f"{formatted_value:.2f}"
+    else:
+        value_str = f"{formatted_value}"
+    
+    if unit:
+        value_str += f" {unit}"
+    
+    return f"  {description:<30} {value_str:>15}"
+
+# One entry of get_parameter_list
+ParamListEntry = namedtuple('ParamListEntry', [
+    'address', 'name', 'description', 'unit', 'category',
+    'function_code', 'address_int', 'is_holding'
+])
+
+# Display order of categories in the human-readable output
+_CATEGORY_ORDER = ('pv', 'battery', 'load', 'system', 'statistics', 'config')
+_CATEGORY_ORDER_SET = frozenset(_CATEGORY_ORDER)
+
+CSV_HEADER = ('Address', 'Name', 'Description', 'Value', 'Unit', 'Category', 'Raw Value')
+
+@dataclass(frozen=True)
 class ParameterReading:
     """Single parameter reading with metadata"""
+    __slots__ = ('address', 'name', 'description', 'raw_value', 'formatted_value',
+                 'unit', 'category', 'timestamp')
+    
     address: int
     name: str
     description: str
@@ -33,7 +85,7 @@ class ParameterReading:
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
         return {
-            'address': f'0x{self.address:04X}',
+            'address': hex_address(self.address),
             'name': self.name,
             'description': self.description,
             'raw_value': self.raw_value,
@@ -43,23 +95,60 @@ class ParameterReading:
             'timestamp': self.timestamp.isoformat()
         }
 
-@dataclass
+@dataclass(frozen=True, eq=False)
 class DeviceSnapshot:
-    """Complete device data snapshot"""
+    """Complete device data snapshot
+    
+    Immutable once built: parameters is stored as a tuple, and the indexes
+    below are cached on first use. Compares and hashes by identity.
+    """
+    # The last two slots hold the lazily built indexes
+    __slots__ = ('timestamp', 'device_info', 'parameters', '_by_category', '_by_name')
+    
     timestamp: datetime
     device_info: Dict[str, Any]
-    parameters: List[ParameterReading]
+    parameters: Tuple[ParameterReading, ...]
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'parameters', tuple(self.parameters))
+        object.__setattr__(self, '_by_category', None)
+        object.__setattr__(self, '_by_name', None)
+    
+    @property
+    def by_category(self) -> Dict[str, List[ParameterReading]]:
+        """Parameters grouped by category, each group sorted by address
+        
+        Computed on first use; callers must not modify the returned lists.
+        """
+        if self._by_category is None:
+            categories = defaultdict(list)
+            for p in self.parameters:
+                categories[p.category].append(p)
+            for params in categories.values():
+                params.sort(key=attrgetter('address'))
+            object.__setattr__(self, '_by_category', dict(categories))
+        return self._by_category
     
     def get_by_category(self, category: str) -> List[ParameterReading]:
         """Get parameters by category"""
-        return [p for p in self.parameters if p.category == category]
+        return list(self.by_category.get(category, ()))
+    
+    @property
+    def by_name(self) -> Dict[str, ParameterReading]:
+        """Parameters indexed by name, first reading wins
+        
+        Computed on first use, like by_category.
+        """
+        if self._by_name is None:
+            index = {}
+            for p in self.parameters:
+                index.setdefault(p.name, p)
+            object.__setattr__(self, '_by_name', index)
+        return self._by_name
     
     def get_by_name(self, name: str) -> Optional[ParameterReading]:
         """Get parameter by name"""
-        for p in self.parameters:
-            if p.name == name:
-                return p
-        return None
+        return self.by_name.get(name)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -99,6 +188,43 @@ class DeviceSnapshot:
         
         return summary
 
+def _orjson_default(obj: Any) -> Any:
+    """orjson hook serializing readings and snapshots without building to_dict() first"""
+    if isinstance(obj, ParameterReading):
+        return {
+            'address': hex_address(obj.address),
+            'name': obj.name,
+            'description': obj.description,
+            'raw_value': obj.raw_value,
+            'formatted_value': obj.formatted_value,
+            'unit': obj.unit,
+            'category': obj.category,
+            'timestamp': obj.timestamp
+        }
+    if isinstance(obj, DeviceSnapshot):
+        # The parameter list is passed through as is; orjson converts each reading
+        return {
+            'timestamp': obj.timestamp,
+            'device_info': obj.device_info,
+            'parameters': obj.parameters,
+            'summary': obj.get_summary()
+        }
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps_orjson(snapshot: DeviceSnapshot) -> Optional[str]:
+    """Serialize a snapshot as indented JSON with orjson, or None if it isn't installed
+    
+    Writes non-ASCII text as is, so the stdlib paths use ensure_ascii=False to match.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+    
+    # Dataclasses go through the hook so addresses keep their 0xNNNN form
+    return orjson.dumps(snapshot, default=_orjson_default,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS).decode()
+
 class DeviceDataManager:
     """Manages device data collection and formatting"""
     
@@ -111,9 +237,15 @@ class DeviceDataManager:
         }
         self.all_parameters = get_all_parameters()
     
-    def create_parameter_reading(self, address: int, raw_value: int, is_holding: bool = False) -> Optional[ParameterReading]:
-        """Create a formatted parameter reading"""
-        formatted_data = format_value(address, raw_value, is_holding)
+    def create_parameter_reading(self, address: int, raw_value: int, is_holding: bool = False,
+                                 timestamp: Optional[datetime] = None) -> Optional[ParameterReading]:
+        """Create a formatted parameter reading
+        
+        Readings that belong to one snapshot should share its timestamp.
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        formatted_data = _format_value_cached(address, raw_value, is_holding)
         
         if 'name' not in formatted_data:
             # Unknown parameter
@@ -125,7 +257,7 @@ class DeviceDataManager:
                 formatted_value=raw_value,
                 unit='',
                 category='unknown',
-                timestamp=datetime.now()
+                timestamp=timestamp
             )
         
         return ParameterReading(
@@ -136,35 +268,40 @@ class DeviceDataManager:
             formatted_value=formatted_data['formatted'],
             unit=formatted_data['unit'],
             category=formatted_data['category'],
-            timestamp=datetime.now()
+            timestamp=timestamp
         )
     
     def create_device_snapshot(self, register_data: Dict[int, int], holding_data: Dict[int, int] = None) -> DeviceSnapshot:
         """Create a complete device snapshot from register data"""
         parameters = []
+        timestamp = datetime.now()
         
         # Process input registers (real-time data)
         for address, value in register_data.items():
-            param = self.create_parameter_reading(address, value, is_holding=False)
+            param = self.create_parameter_reading(address, value, is_holding=False, timestamp=timestamp)
             if param:
                 parameters.append(param)
         
         # Process holding registers (configuration data)
         if holding_data:
             for address, value in holding_data.items():
-                param = self.create_parameter_reading(address, value, is_holding=True)
+                param = self.create_parameter_reading(address, value, is_holding=True, timestamp=timestamp)
                 if param:
                     parameters.append(param)
         
         return DeviceSnapshot(
-            timestamp=datetime.now(),
+            timestamp=timestamp,
             device_info=self.device_info,
             parameters=parameters
         )
     
-    def get_efficient_read_blocks(self) -> Dict[str, Dict[str, Any]]:
-        """Get optimized register blocks for efficient reading"""
-        return {
+    def get_efficient_read_blocks(self, category: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Get optimized register blocks for efficient reading
+        
+        With a category, only the matching blocks are returned: holding
+        register blocks for 'config', input register blocks otherwise.
+        """
+        blocks = {
             'realtime_core': {
                 'function_code': 4,
                 'start_address': 0x3100,
@@ -208,67 +345,130 @@ class DeviceDataManager:
                 'description': 'Extended configuration'
             }
         }
+        
+        if category:
+            function_code = 3 if category == 'config' else 4
+            blocks = {name: info for name, info in blocks.items() if info['function_code'] == function_code}
+        
+        return blocks
     
-    def get_parameter_list(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get list of available parameters, optionally filtered by category"""
-        param_list = []
+    def get_parameter_list(self, category: Optional[str] = None) -> Iterator[ParamListEntry]:
+        """Iterate over available parameters, optionally filtered by category
+        
+        Entries are generated lazily; wrap in list() to keep them.
+        """
+        return self._iter_parameter_list(category)
+    
+    def _iter_parameter_list(self, category: Optional[str]) -> Iterator[ParamListEntry]:
+        """Yield one ParamListEntry per known parameter"""
+        make_entry = ParamListEntry._make
         
         for cat, params in self.all_parameters.items():
             if category and cat != category:
                 continue
                 
             for param in params:
-                param_list.append({
-                    'address': param['hex_address'],
-                    'name': param['name'],
-                    'description': param['description'],
-                    'unit': param['unit'],
-                    'category': param['category'],
-                    'function_code': param['function_code']
-                })
-        
-        return param_list
+                yield make_entry((
+                    param['hex_address'],
+                    param['name'],
+                    param['description'],
+                    param['unit'],
+                    param['category'],
+                    param['function_code'],
+                    int(param['hex_address'], 16),
+                    param['function_code'] == 3
+                ))
     
     def get_categories(self) -> List[str]:
         """Get list of available parameter categories"""
         return list(self.all_parameters.keys())
     
-    def format_for_output(self, snapshot: DeviceSnapshot, output_format: str = 'human') -> str:
-        """Format device snapshot for different output types"""
+    def format_for_output(self, snapshot: DeviceSnapshot, output_format: str = 'human',
+                          file: Optional[TextIO] = None) -> Optional[str]:
+        """Format device snapshot for different output types
+        
+        Returns the formatted text, or writes it straight to file if one is
+        given (returning None) without building the whole string.
+        """
+        if output_format == 'json':
+            text = _dumps_orjson(snapshot)
+            if text is not None:
+                if file is None:
+                    return text
+                file.write(text)
+                return None
+        
+        if file is None:
+            if output_format == 'csv':
+                import io
+                output = io.StringIO()
+                self._write_csv(snapshot, output)
+                return output.getvalue()
+            return ''.join(self.format_for_output_iter(snapshot, output_format))
+        
+        if output_format == 'csv':
+            self._write_csv(snapshot, file)
+        elif output_format == 'json':
+            import json
+            json.dump(snapshot.to_dict(), file, indent=2, ensure_ascii=False)
+        else:
+            file.writelines(self.format_for_output_iter(snapshot, output_format))
+        return None
+    
+    def format_for_output_iter(self, snapshot: DeviceSnapshot, output_format: str = 'human') -> Iterator[str]:
+        """Format device snapshot as a stream of text chunks, one row at a time where possible"""
         if output_format == 'json':
             import json
-            return json.dumps(snapshot.to_dict(), indent=2)
+            return json.JSONEncoder(indent=2, ensure_ascii=False).iterencode(snapshot.to_dict())
         
         elif output_format == 'csv':
-            import csv
-            import io
-            
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Header
-            writer.writerow(['Address', 'Name', 'Description', 'Value', 'Unit', 'Category', 'Raw Value'])
-            
-            # Data rows
-            for param in snapshot.parameters:
-                writer.writerow([
-                    f'0x{param.address:04X}',
-                    param.name,
-                    param.description,
-                    param.formatted_value,
-                    param.unit,
-                    param.category,
-                    param.raw_value
-                ])
-            
-            return output.getvalue()
+            return self._iter_csv(snapshot)
         
         elif output_format == 'human':
-            return self._format_human_readable(snapshot)
+            return iter((self._format_human_readable(snapshot),))
         
         else:
             raise ValueError(f"Unsupported output format: {output_format}")
     
+    def _iter_csv(self, snapshot: DeviceSnapshot) -> Iterator[str]:
+        """Yield the CSV header and then one formatted row per parameter"""
+        import csv
+        import io
+        
+        # One small buffer is reused for every row
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        # Header
+        writer.writerow(CSV_HEADER)
+        yield output.getvalue()
+        
+        # Data rows
+        for row in self._csv_rows(snapshot):
+            output.seek(0)
+            output.truncate()
+            writer.writerow(row)
+            yield output.getvalue()
+    
+    def _write_csv(self, snapshot: DeviceSnapshot, file: TextIO):
+        """Write the CSV header and all rows with a single writerows call"""
+        import csv
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(self._csv_rows(snapshot))
+    
+    def _csv_rows(self, snapshot: DeviceSnapshot) -> Iterator[tuple]:
+        """Yield one CSV row per parameter"""
+        return ((
+            hex_address(param.address),
+            param.name,
+            param.description,
+            param.formatted_value,
+            param.unit,
+            param.category,
+            param.raw_value
+        ) for param in snapshot.parameters)
+    
     def _format_human_readable(self, snapshot: DeviceSnapshot) -> str:
         """Format snapshot in human-readable format"""
         lines = []
@@ -276,49 +476,22 @@ class DeviceDataManager:
         lines.append(f"Solar Charger Status - {snapshot.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
         lines.append("=" * 60)
         
-        # Group by category
-        categories = {}
-        for param in snapshot.parameters:
-            if param.category not in categories:
-                categories[param.category] = []
-            categories[param.category].append(param)
+        # Grouped by category and sorted by address once per snapshot
+        categories = snapshot.by_category
         
-        # Display each category
-        category_order = ['pv', 'battery', 'load', 'system', 'statistics', 'config']
+        # Known categories in display order, then any others
+        ordered = [c for c in _CATEGORY_ORDER if c in categories]
+        ordered.extend(c for c in categories if c not in _CATEGORY_ORDER_SET)
         
-        for category in category_order:
-            if category in categories:
-                lines.append(f"\n{category.upper()} PARAMETERS:")
-                lines.append("-" * 40)
-                
-                for param in sorted(categories[category], key=lambda x: x.address):
-                    # Format the value with consistent decimal places for floats
-                    if isinstance(param.formatted_value, float):
-                        value_str = f"{param.formatted_value:.2f}"
-                    else:
-                        value_str = f"{param.formatted_value}"
-                    
-                    if param.unit:
-                        value_str += f" {param.unit}"
-                    
-                    lines.append(f"  {param.description:<30} {value_str:>15}")
-        
-        # Add any remaining categories
-        for category, params in categories.items():
-            if category not in category_order:
-                lines.append(f"\n{category.upper()} PARAMETERS:")
-                lines.append("-" * 40)
-                
-                for param in sorted(params, key=lambda x: x.address):
-                    # Format the value with consistent decimal places for floats
-                    if isinstance(param.formatted_value, float):
-                        value_str = f"{param.formatted_value:.2f}"
-                    else:
-                        value_str = f"{param.formatted_value}"
-                    
-                    if param.unit:
-                        value_str += f" {param.unit}"
-                    
-                    lines.append(f"  {param.description:<30} {value_str:>15}")
+        for category in ordered:
+            lines.append(f"\n{category.upper()} PARAMETERS:")
+            lines.append("-" * 40)
+            
+            for param in categories[category]:
+                try:
+                    lines.append(_render_row(param.description, param.formatted_value, param.unit))
+                except TypeError:
+                    # Unhashable value, render it without the cache
+                    lines.append(_render_row.__wrapped__(param.description, param.formatted_value, param.unit))
         
         return "\n".join(lines)
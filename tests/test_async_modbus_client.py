@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio Modbus RTU client
+Runs against fake streams, so pyserial-asyncio itself is not needed
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from communication import async_modbus_client
+from communication.async_modbus_client import AsyncModbusRTUClient
+from communication.modbus_client import ModbusRTUClient
+
+
+class FakeWriter:
+    """Stream writer that feeds the next queued reply to its reader on each request"""
+    
+    transport = None
+    
+    def __init__(self, reader, replies):
+        self.reader = reader
+        self.replies = replies
+        self.closed = False
+    
+    def write(self, data):
+        if self.replies:
+            self.reader.feed_data(self.replies.pop(0))
+    
+    async def drain(self):
+        pass
+    
+    def is_closing(self):
+        return self.closed
+    
+    def close(self):
+        self.closed = True
+    
+    async def wait_closed(self):
+        pass
+
+
+class FakeSerialAsyncio:
+    """Stand-in for the serial_asyncio module; opens fail once fail_opens is set"""
+    
+    def __init__(self, replies):
+        self.replies = replies
+        self.opens = 0
+        self.fail_opens = False
+    
+    async def open_serial_connection(self, **kwargs):
+        if self.fail_opens:
+            raise OSError("device unplugged")
+        self.opens += 1
+        reader = asyncio.StreamReader()
+        return reader, FakeWriter(reader, self.replies)
+
+
+class AsyncClientTests(unittest.TestCase):
+    
+    def run_with(self, replies, scenario):
+        fake = FakeSerialAsyncio(replies)
+        
+        async def run():
+            client = AsyncModbusRTUClient('/dev/null', timeout=0.05)
+            await client.connect()
+            return await scenario(client, fake)
+        
+        with mock.patch.object(async_modbus_client, 'serial_asyncio', fake):
+            return asyncio.run(run()), fake
+    
+    def frame(self, data):
+        return data + ModbusRTUClient('/dev/null').calculate_crc16(data)
+    
+    def test_is_not_a_blocking_client(self):
+        self.assertFalse(issubclass(AsyncModbusRTUClient, ModbusRTUClient))
+    
+    def test_partial_reply_is_discarded_before_next_read(self):
+        good = self.frame(bytes([1, 4, 4, 0, 10, 0, 20]))
+        
+        async def scenario(client, fake):
+            first = await client.read_register_block(0x3100, 2)
+            second = await client.read_register_block(0x3100, 2)
+            return first, second
+        
+        (first, second), fake = self.run_with([good[:5], good], scenario)
+        
+        self.assertIsNone(first)
+        self.assertEqual(second, {0x3100: 10, 0x3101: 20})
+        self.assertEqual(fake.opens, 2)
+    
+    def test_waiting_read_sees_closed_stream_after_failed_resync(self):
+        async def scenario(client, fake):
+            fake.fail_opens = True
+            return await asyncio.gather(
+                client.read_registers(0x04, 0x3100, 1),
+                client.read_registers(0x04, 0x3101, 1),
+                return_exceptions=True,
+            )
+        
+        (first, second), _ = self.run_with([], scenario)
+        
+        self.assertIsNone(first)
+        self.assertIsInstance(second, ConnectionError)
+
+
+if __name__ == '__main__':
+    unittest.main()
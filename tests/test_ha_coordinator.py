@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for failed updates, failed entry setup and sensor specs in the Home Assistant integration
+Skipped unless Home Assistant is installed
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'homeassistant'))
+
+try:
+    from homeassistant.helpers.update_coordinator import UpdateFailed
+    from custom_components import tracer_solar_charger
+    from custom_components.tracer_solar_charger import TracerSolarChargerCoordinator
+    from custom_components.tracer_solar_charger.const import DEFAULT_RETRY_INTERVAL, SENSOR_TYPES
+except ImportError as err:
+    raise unittest.SkipTest(f"Home Assistant is not installed: {err}")
+
+
+class FakeClient:
+    """Client whose reads time out while timed_out is set"""
+    
+    port = '/dev/null'
+    
+    def __init__(self):
+        self.is_connected = True
+        self.timed_out = False
+        self.disconnects = 0
+    
+    def connect(self):
+        self.is_connected = True
+        return True
+    
+    def disconnect(self):
+        self.is_connected = False
+        self.disconnects += 1
+    
+    def read_registers(self, function_code, start_addr, num_registers=1):
+        if self.timed_out:
+            # What the client returns when the device does not answer
+            return None
+        return list(range(num_registers))
+
+
+class CoordinatorTimeoutTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = FakeClient()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown)
+    
+    def make_coordinator(self):
+        return TracerSolarChargerCoordinator(
+            mock.MagicMock(), self.client, asyncio.Lock(), self.executor,
+            "realtime", [(0x3100, 4)], 0x04, 30,
+        )
+    
+    def test_timed_out_read_keeps_last_data_and_retries_soon(self):
+        async def run():
+            coordinator = self.make_coordinator()
+            coordinator.data = await coordinator._async_update_data()
+            
+            self.client.timed_out = True
+            data = await coordinator._async_update_data()
+            return coordinator, data
+        
+        coordinator, data = asyncio.run(run())
+        
+        self.assertIs(data, coordinator.data)
+        self.assertEqual(data.get(0x3100), 0)
+        self.assertEqual(coordinator.update_interval, timedelta(seconds=DEFAULT_RETRY_INTERVAL))
+        self.assertEqual(self.client.disconnects, 1)
+    
+    def test_timed_out_first_read_fails_the_update(self):
+        self.client.timed_out = True
+        
+        async def run():
+            await self.make_coordinator()._async_update_data()
+        
+        with self.assertRaises(UpdateFailed):
+            asyncio.run(run())
+
+
+
+class FakeCoordinator:
+    """Coordinator whose first refresh can be made to fail"""
+    
+    def __init__(self, client, executor, error=None):
+        self.client = client
+        self.executor = executor
+        self.error = error
+    
+    async def async_config_entry_first_refresh(self):
+        if self.error:
+            raise self.error
+
+
+class SetupEntryTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = FakeClient()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown)
+        self.hass = mock.MagicMock()
+        self.hass.data = {}
+        self.hass.config_entries.async_forward_entry_setups = mock.AsyncMock(return_value=None)
+        self.hass.config_entries.async_unload_platforms = mock.AsyncMock(return_value=True)
+        self.entry = mock.MagicMock(entry_id='entry', data={})
+    
+    def setup_entry(self, coordinators):
+        with mock.patch.object(tracer_solar_charger, 'create_coordinators', return_value=coordinators):
+            return asyncio.run(tracer_solar_charger.async_setup_entry(self.hass, self.entry))
+    
+    def test_failed_refresh_unloads_platforms_and_releases_port(self):
+        coordinators = [FakeCoordinator(self.client, self.executor, RuntimeError("not ready"))]
+        
+        with self.assertRaises(RuntimeError):
+            self.setup_entry(coordinators)
+        
+        self.hass.config_entries.async_forward_entry_setups.assert_awaited_once()
+        self.hass.config_entries.async_unload_platforms.assert_awaited_once()
+        self.assertNotIn('entry', self.hass.data[tracer_solar_charger.DOMAIN])
+        self.assertEqual(self.client.disconnects, 1)
+    
+    def test_successful_setup_keeps_coordinators(self):
+        coordinators = [FakeCoordinator(self.client, self.executor)]
+        
+        self.assertTrue(self.setup_entry(coordinators))
+        
+        self.hass.config_entries.async_unload_platforms.assert_not_awaited()
+        self.assertIs(self.hass.data[tracer_solar_charger.DOMAIN]['entry'], coordinators)
+        self.assertEqual(self.client.disconnects, 0)
+
+
+
+class SensorSpecTests(unittest.TestCase):
+    
+    def test_specs_are_hashable(self):
+        for spec in SENSOR_TYPES.values():
+            hash(spec)
+
+
+if __name__ == '__main__':
+    unittest.main()
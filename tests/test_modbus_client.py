@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for the Modbus RTU client
+Runs against fake serial ports answering from a register map or with canned replies
+"""
+
+import os
+import struct
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from communication import modbus_client
+from communication.modbus_client import ModbusRTUClient, MAX_READ_REGISTERS
+
+
+class FakeSerial:
+    """Serial port answering read requests, with exception 02 for undefined registers"""
+    
+    is_open = True
+    timeout = 1.0
+    
+    def __init__(self, client, registers):
+        self.client = client
+        self.registers = registers
+        self.requests = []
+        self._reply = b''
+    
+    def reset_input_buffer(self):
+        self._reply = b''
+    
+    def write(self, cmd):
+        slave_id, function_code, start_addr, count = struct.unpack('>BBHH', cmd[:6])
+        self.requests.append((start_addr, count))
+        addresses = range(start_addr, start_addr + count)
+        if all(addr in self.registers for addr in addresses):
+            values = [self.registers[addr] for addr in addresses]
+            frame = struct.pack(f'>BBB{count}H', slave_id, function_code, count * 2, *values)
+        else:
+            frame = bytes([slave_id, function_code | 0x80, 0x02])
+        self._reply = frame + self.client.calculate_crc16(frame)
+    
+    def readinto(self, buf):
+        n = min(len(buf), len(self._reply))
+        buf[:n] = self._reply[:n]
+        self._reply = self._reply[n:]
+        return n
+
+
+class CoalescedReadTests(unittest.TestCase):
+    
+    def connect(self, registers):
+        client = ModbusRTUClient('/dev/null')
+        client.serial_conn = FakeSerial(client, registers)
+        return client
+    
+    def test_nearby_addresses_share_one_request(self):
+        client = self.connect({addr: addr & 0xFF for addr in range(0x3100, 0x3110)})
+        values = client.read_registers_coalesced([0x3104, 0x3100, 0x3108, 0x3100])
+        
+        self.assertEqual(client.serial_conn.requests, [(0x3100, 9)])
+        self.assertEqual(values, {0x3100: 0x00, 0x3104: 0x04, 0x3108: 0x08})
+    
+    def test_gap_beyond_threshold_starts_new_request(self):
+        client = self.connect({addr: 1 for addr in range(0x3100, 0x3120)})
+        client.read_registers_coalesced([0x3100, 0x3105, 0x310A], gap_threshold=4)
+        
+        self.assertEqual(client.serial_conn.requests, [(0x3100, 1), (0x3105, 1), (0x310A, 1)])
+    
+    def test_runs_are_capped_at_max_request_size(self):
+        client = self.connect({addr: 1 for addr in range(0x3000, 0x3000 + 2 * MAX_READ_REGISTERS)})
+        client.read_registers_coalesced(list(range(0x3000, 0x3000 + MAX_READ_REGISTERS + 1)))
+        
+        self.assertEqual(client.serial_conn.requests,
+                         [(0x3000, MAX_READ_REGISTERS), (0x3000 + MAX_READ_REGISTERS, 1)])
+    
+    def test_rejected_block_omits_only_its_addresses(self):
+        # 0x3102 is undefined, so the device rejects the block spanning it
+        client = self.connect({0x3100: 10, 0x3103: 13, 0x3200: 20})
+        values = client.read_registers_coalesced([0x3100, 0x3103, 0x3200])
+        
+        self.assertEqual(client.serial_conn.requests, [(0x3100, 4), (0x3200, 1)])
+        self.assertEqual(values, {0x3200: 20})
+    
+    def test_corrupted_reply_is_rejected(self):
+        client = self.connect({0x3100: 10, 0x3101: 20})
+        serial_conn = client.serial_conn
+        write = serial_conn.write
+        
+        def write_and_corrupt(cmd):
+            write(cmd)
+            serial_conn._reply = serial_conn._reply[:4] + b'\xff' + serial_conn._reply[5:]
+        serial_conn.write = write_and_corrupt
+        
+        self.assertEqual(client.read_registers_coalesced([0x3100, 0x3101]), {})
+
+
+
+class CannedSerial(FakeSerial):
+    """Serial port giving the same reply to every request"""
+    
+    def __init__(self, reply):
+        super().__init__(None, {})
+        self.reply = reply
+    
+    def write(self, cmd):
+        self.requests.append(cmd)
+        self._reply = self.reply
+
+
+class WriteReplyTests(unittest.TestCase):
+    
+    def write_with_reply(self, frame, crc=None):
+        client = ModbusRTUClient('/dev/null')
+        reply = frame + (crc if crc is not None else client.calculate_crc16(frame))
+        client.serial_conn = CannedSerial(reply)
+        return client.write_single_register(0x9000, 5), client.last_error_code
+    
+    def test_echo_confirms_write(self):
+        self.assertEqual(self.write_with_reply(struct.pack('>BBHH', 1, 0x06, 0x9000, 5)), (True, None))
+    
+    def test_exception_code_is_recorded(self):
+        self.assertEqual(self.write_with_reply(bytes([1, 0x86, 0x03])), (False, 3))
+    
+    def test_corrupt_exception_frame_is_not_recorded(self):
+        self.assertEqual(self.write_with_reply(bytes([1, 0x86, 0x03]), crc=b'\x00\x00'), (False, None))
+    
+    def test_exception_from_other_slave_is_not_recorded(self):
+        self.assertEqual(self.write_with_reply(bytes([2, 0x86, 0x03])), (False, None))
+
+
+
+class Crc16LibraryTests(unittest.TestCase):
+    
+    def test_library_without_symbol_is_ignored(self):
+        with mock.patch.object(modbus_client.ctypes, 'CDLL', return_value=object()):
+            self.assertIsNone(modbus_client._load_crc16_lib())
+    
+    def test_missing_library_is_ignored(self):
+        with mock.patch.object(modbus_client.ctypes, 'CDLL', side_effect=OSError):
+            self.assertIsNone(modbus_client._load_crc16_lib())
+
+
+if __name__ == '__main__':
+    unittest.main()
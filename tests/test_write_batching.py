@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for batched configuration writes in the CLI
+Runs against a fake client that records every Modbus request
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main import SolarChargerCLI
+
+
+class FakeClient:
+    """Holding register store that records the requests made to it"""
+    
+    def __init__(self, fc16_ok=True, failing=(), readback=None):
+        self.registers = {}
+        self.fc16_ok = fc16_ok
+        self.failing = set(failing)
+        # Values the device reports back instead of what was written
+        self.readback = readback or {}
+        self.calls = []
+        self.last_error_code = None
+        # Called on each verify read to capture what was printed so far
+        self.on_read = None
+        self.output_at_read = None
+    
+    def write_multiple_registers(self, start_addr, values):
+        self.calls.append(('fc16', start_addr, list(values)))
+        if not self.fc16_ok:
+            self.last_error_code = 1
+            return False
+        for offset, value in enumerate(values):
+            self.registers[start_addr + offset] = value
+        return True
+    
+    def write_single_register(self, address, value):
+        self.calls.append(('fc06', address, value))
+        if address in self.failing:
+            # Illegal data value: not worth retrying
+            self.last_error_code = 3
+            return False
+        self.last_error_code = None
+        self.registers[address] = value
+        return True
+    
+    def _value(self, address):
+        return self.readback.get(address, self.registers.get(address))
+    
+    def read_registers_coalesced(self, addresses, is_holding=False, gap_threshold=4):
+        self.calls.append(('read', sorted(addresses)))
+        if self.on_read:
+            self.output_at_read = self.on_read()
+        return {addr: self._value(addr) for addr in addresses if self._value(addr) is not None}
+    
+    def read_single_register(self, address, is_holding=False):
+        self.calls.append(('read_single', address))
+        return self._value(address)
+
+
+class TerminalOutput(io.StringIO):
+    """Captured stdout that reports itself as a terminal"""
+    
+    def isatty(self):
+        return True
+
+
+def entry(address, raw_value, name):
+    return (address, raw_value, name, f"Writing {name}...")
+
+
+class WriteContiguousTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.cli = SolarChargerCLI()
+        patcher = mock.patch('main.time.sleep')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def write(self, client, entries):
+        self.cli.client = client
+        output = io.StringIO()
+        with redirect_stdout(output):
+            result = self.cli._write_contiguous(entries, indent="  ")
+        return result, output.getvalue().splitlines()
+    
+    def test_group_contiguous_splits_sorted_runs(self):
+        groups = SolarChargerCLI._group_contiguous([
+            entry(0x9002, 3, 'c'), entry(0x9000, 1, 'a'), entry(0x9005, 6, 'f'), entry(0x9001, 2, 'b'),
+        ])
+        self.assertEqual([[e[0] for e in group] for group in groups],
+                         [[0x9000, 0x9001, 0x9002], [0x9005]])
+    
+    def test_runs_use_one_frame_each_and_one_verify_read(self):
+        client = FakeClient()
+        (written, failed), _ = self.write(client, [
+            entry(0x9005, 6, 'f'), entry(0x9000, 1, 'a'), entry(0x9001, 2, 'b'),
+        ])
+        
+        self.assertEqual(client.calls, [
+            ('fc16', 0x9000, [1, 2]),
+            ('fc06', 0x9005, 6),
+            ('read', [0x9000, 0x9001, 0x9005]),
+        ])
+        self.assertEqual(written, ['a', 'b', 'f'])
+        self.assertEqual(failed, [])
+    
+    def test_rejected_fc16_falls_back_to_fc06(self):
+        client = FakeClient(fc16_ok=False, failing={0x9001})
+        (written, failed), _ = self.write(client, [
+            entry(0x9000, 1, 'a'), entry(0x9001, 2, 'b'), entry(0x9002, 3, 'c'),
+        ])
+        
+        self.assertEqual(client.calls, [
+            ('fc16', 0x9000, [1, 2, 3]),
+            ('fc06', 0x9000, 1),
+            ('fc06', 0x9001, 2),
+            ('fc06', 0x9002, 3),
+            ('read', [0x9000, 0x9002]),
+        ])
+        self.assertEqual(written, ['a', 'c'])
+        self.assertEqual(failed, ['b'])
+        self.assertEqual(client.registers, {0x9000: 1, 0x9002: 3})
+    
+    def test_report_lines_follow_each_address(self):
+        client = FakeClient(fc16_ok=False, failing={0x9001}, readback={0x9002: 9})
+        _, lines = self.write(client, [
+            entry(0x9000, 1, 'a'), entry(0x9001, 2, 'b'), entry(0x9002, 3, 'c'),
+        ])
+        
+        self.assertEqual(lines, [
+            "Writing a...", "  ✓ Success",
+            "Writing b...", "  ✗ Failed",
+            "Writing c...", "  ✓ Success",
+            "Verifying 2 written value(s)...",
+            "  ✓ a verified",
+            "  ⚠️  c verification failed: expected 3, got 9",
+        ])
+    
+    def test_terminal_sees_write_results_before_verification(self):
+        terminal = TerminalOutput()
+        client = FakeClient()
+        client.on_read = lambda: terminal.getvalue()
+        self.cli.client = client
+        with redirect_stdout(terminal):
+            self.cli._write_contiguous([entry(0x9000, 1, 'a')], indent="  ")
+        
+        self.assertEqual(client.output_at_read.splitlines(),
+                         ["Writing a...", "  ✓ Success", "Verifying 1 written value(s)..."])
+    
+    def test_piped_output_is_written_once(self):
+        client = FakeClient()
+        client.on_read = lambda: sys.stdout.getvalue()
+        _, lines = self.write(client, [entry(0x9000, 1, 'a')])
+        
+        self.assertEqual(client.output_at_read, "")
+        self.assertEqual(len(lines), 4)
+    
+    def test_no_verify_skips_read_back(self):
+        client = FakeClient()
+        self.cli.client = client
+        with redirect_stdout(io.StringIO()):
+            written, _ = self.cli._write_contiguous([entry(0x9000, 1, 'a')], indent="  ", verify=False)
+        
+        self.assertEqual(written, ['a'])
+        self.assertEqual(client.calls, [('fc06', 0x9000, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()